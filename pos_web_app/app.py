@@ -7,24 +7,53 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from storage import Database
-from executor import Executor
+from executor import Executor, ExecutorError
+from session_store import InMemorySessionInterface
 
 app = Flask(__name__)
 app.secret_key = 'mydb-pos-secret-key-2026'  # For session management
+# Keep carts server-side: the cookie carries only a session id, so cart
+# updates don't re-serialize and re-sign the whole cart on every response
+app.config['SESSION_PERMANENT'] = False
+app.session_interface = InMemorySessionInterface()
 
-# Initialize DB
-DB_FILE = "pos_store.josedb"
+# Initialize DB (next to this file, so it does not depend on the working directory)
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pos_store.josedb")
 db = Database()
-executor = Executor(db, DB_FILE)
+# Catalog and sales pages re-run the same SELECTs; cache them until the tables change
+executor = Executor(db, DB_FILE, result_cache_size=128)
+
+# Queries behind the common POS views
+WARMUP_QUERIES = [
+    "SELECT * FROM products",
+    "SELECT * FROM sales",
+    "SELECT * FROM sale_items",
+]
 
 # Load existing database
 if os.path.exists(DB_FILE):
     db.load_from_file(DB_FILE)
     print(f"Loaded existing POS database: {DB_FILE}")
+    # Databases created before the day-bucket index existed
+    if 'sales' in db.tables and 'sale_day' not in db.tables['sales'].secondary_indexes:
+        executor.create_index('sales', 'sale_day', 'sale_date', prefix_length=10)
+    # Parse and cache the catalog/report queries before the first request
+    executor.warmup(WARMUP_QUERIES)
 else:
     print(f"Warning: Database file '{DB_FILE}' not found!")
     print("Please run: python pos_web_app/init_db.py")
 
+@app.teardown_request
+def _flush_db(exc):
+    """Persist any modifications left unsaved by the request"""
+    executor.flush()
+
+def _products_by_id(products=None):
+    """Key the product catalog by product id (fetching it unless already loaded)"""
+    if products is None:
+        products = executor.execute("SELECT * FROM products")
+    return {int(p['id']): p for p in products}
+
 @app.route('/')
 def index():
     """Main POS/Cashier interface"""
@@ -36,11 +65,11 @@ def index():
     # Calculate cart total
     cart_total = 0
     cart_items = []
+    prod_map = _products_by_id(products)
     for product_id, quantity in cart.items():
         # Get product details
-        product = executor.execute(f"SELECT * FROM products WHERE id = {product_id}")
-        if product:
-            p = product[0]
+        p = prod_map.get(int(product_id))
+        if p:
             subtotal = int(p['price']) * quantity
             cart_total += subtotal
             cart_items.append({
@@ -109,53 +138,48 @@ def checkout():
     customer_name = request.form.get('customer_name', 'Guest')
     payment_method = request.form.get('payment_method', 'Cash')
     
-    # Calculate total
-    total_amount = 0
-    sale_items_data = []
-    
-    for product_id, quantity in cart.items():
-        product = executor.execute(f"SELECT * FROM products WHERE id = {product_id}")
-        if product:
-            p = product[0]
-            subtotal = int(p['price']) * quantity
-            total_amount += subtotal
-            sale_items_data.append({
-                'product_id': product_id,
-                'quantity': quantity,
-                'subtotal': subtotal,
-                'stock': p['stock']
-            })
-    
-    # Generate receipt number
-    receipt_no = f"RCP{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    
-    # Get next sale ID
-    sales = executor.execute("SELECT id FROM sales")
-    sale_id = 1
-    if sales:
-        sale_id = max(int(s['id']) for s in sales) + 1
-    
-    # Insert sale record
-    sale_date = datetime.now().strftime("%Y-%m-%d %H:%M")
-    sql = f"INSERT INTO sales VALUES ({sale_id}, '{receipt_no}', '{customer_name}', '{payment_method}', {total_amount}, '{sale_date}')"
-    executor.execute(sql)
-    
-    # Insert sale items and update stock
-    sale_items = executor.execute("SELECT id FROM sale_items")
-    item_id = 1
-    if sale_items:
-        item_id = max(int(i['id']) for i in sale_items) + 1
-    
-    for item in sale_items_data:
-        # Insert sale item
-        sql = f"INSERT INTO sale_items VALUES ({item_id}, {sale_id}, {item['product_id']}, {item['quantity']}, {item['subtotal']})"
-        executor.execute(sql)
-        item_id += 1
-        
-        # Update product stock
-        new_stock = int(item['stock']) - item['quantity']
-        sql = f"UPDATE products SET stock = {new_stock} WHERE id = {item['product_id']}"
-        executor.execute(sql)
+    # Receipt number and sale date share one timestamp
+    now = datetime.now()
+    receipt_no = f"RCP{now.strftime('%Y%m%d%H%M%S')}"
+    sale_date = now.strftime("%Y-%m-%d %H:%M")
+    
+    # Write the sale, its items and the stock updates as one save;
+    # on failure the transaction rolls back and the cart is kept
+    try:
+        with executor.transaction():
+            # Stock is read and ids allocated inside the transaction, which
+            # holds the executor lock: concurrent checkouts cannot both sell
+            # the same stock or take the same sale id
+            prod_map = _products_by_id()
+            sale_items_data = [
+                {
+                    'product_id': int(product_id),
+                    'quantity': quantity,
+                    'subtotal': int(p['price']) * quantity,
+                    'stock': p['stock']
+                }
+                for product_id, quantity in cart.items()
+                if (p := prod_map.get(int(product_id)))
+            ]
+            total_amount = sum(item['subtotal'] for item in sale_items_data)
+            sale_id = executor.allocate_id('sales')
+            
+            # Insert sale record
+            executor.execute("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)",
+                             (sale_id, receipt_no, customer_name, payment_method, total_amount, sale_date))
+            
+            # Insert sale items and update stock, one batch each
+            executor.execute_many("INSERT INTO sale_items VALUES (?, ?, ?, ?, ?)", [
+                (executor.allocate_id('sale_items'), sale_id, item['product_id'], item['quantity'], item['subtotal'])
+                for item in sale_items_data
+            ])
+            executor.execute_many("UPDATE products SET stock = ? WHERE id = ?", [
+                (int(item['stock']) - item['quantity'], item['product_id'])
+                for item in sale_items_data
+            ])
+    except ExecutorError as e:
+        flash(f"Checkout failed: {e}")
+        return redirect(url_for('index'))
     
     # Clear cart
     session['cart'] = {}
@@ -179,7 +203,7 @@ def reports_page():
     
     # Calculate today's revenue
     today = datetime.now().strftime("%Y-%m-%d")
-    today_sales = [s for s in sales if s['sale_date'].startswith(today)]
+    today_sales = executor.lookup_by('sales', 'sale_day', today)
     today_revenue = sum(int(s['total_amount']) for s in today_sales)
     
     return render_template('reports.html', 
@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for MyDB-POS
+Usage (from the project root): gunicorn -c pos_web_app/gunicorn.conf.py wsgi:app
+
+The database and the session store live in process memory, so all requests
+must share one worker process. Concurrency comes from threads instead: the
+Executor serializes statements with a lock, and requests spend most of their
+time in template rendering and socket I/O.
+"""
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = "0.0.0.0:5001"
+
+workers = 1
+worker_class = "gthread"
+threads = 2 * (os.cpu_count() or 1) + 1
+keepalive = 5
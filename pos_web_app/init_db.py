@@ -11,8 +11,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from storage import Database
 from executor import Executor
 
-# Initialize database
-DB_FILE = "pos_store.josedb"
+# Initialize database (next to the app, wherever this script is run from)
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pos_store.josedb")
 db = Database()
 executor = Executor(db, DB_FILE)
 
@@ -54,6 +54,9 @@ executor.execute("""
     )
 """)
 
+# Day bucket ('YYYY-MM-DD') over sale_date, used by the reports page
+executor.create_index('sales', 'sale_day', 'sale_date', prefix_length=10)
+
 # Seed sample products (Cafe theme)
 print("\n4. Seeding sample products...")
 
@@ -82,9 +85,9 @@ products = [
     (15, 'Sandwich', 'SNK003', 'Snacks', 350, 12),
 ]
 
+# One batch: validated and saved once
+executor.execute_many("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)", products)
 for product in products:
-    sql = f"INSERT INTO products VALUES ({product[0]}, '{product[1]}', '{product[2]}', '{product[3]}', {product[4]}, {product[5]})"
-    executor.execute(sql)
     print(f"   ✓ Added: {product[1]} (Stock: {product[5]})")
 
 print("\n✅ Database initialization complete!")
@@ -0,0 +1,14 @@
+"""
+WSGI entry point for MyDB-POS
+Run with: gunicorn -c pos_web_app/gunicorn.conf.py wsgi:app
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import app
+
+if __name__ == '__main__':
+    # Development only; production goes through gunicorn
+    app.run(host='0.0.0.0', debug=True, port=5001)
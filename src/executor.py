@@ -1,52 +1,412 @@
-from typing import Any, List, Dict, Optional, Union, Tuple
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Iterator, List, Dict, Optional, Sequence, Union, Tuple
 from storage import Database, Table
-from sql_parser import parse_command
+from sql_parser import parse_command, PLACEHOLDER
+from wal import WriteAheadLog, WAL_SUFFIX, file_lock
+
+# Maximum number of distinct SQL templates kept in the parsed-plan cache
+PLAN_CACHE_SIZE = 256
+
+def _count_params(parsed: Dict[str, Any]) -> int:
+    """Counts '?' placeholders in a parsed statement."""
+    count = sum(1 for v in parsed.get('values') or () if v is PLACEHOLDER)
+    for key in ('set', 'where'):
+        count += sum(1 for v in (parsed.get(key) or {}).values() if v is PLACEHOLDER)
+    return count
+
+def _bind_params(parsed: Dict[str, Any], params: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of a parsed statement with each placeholder replaced by
+    the next value from params (VALUES first, then SET, then WHERE).
+    The cached plan itself is never modified.
+    """
+    values = iter(params)
+
+    def sub(v):
+        return next(values) if v is PLACEHOLDER else v
+
+    bound = dict(parsed)
+    if parsed.get('values') is not None:
+        bound['values'] = [sub(v) for v in parsed['values']]
+    for key in ('set', 'where'):
+        if parsed.get(key):
+            bound[key] = {col: sub(v) for col, v in parsed[key].items()}
+    return bound
+
+def _is_count(parsed: Dict[str, Any]) -> bool:
+    """True for `SELECT COUNT(*) FROM ...`."""
+    columns = parsed.get('columns')
+    return columns is not None and len(columns) == 1 and columns[0].replace(' ', '').upper() == 'COUNT(*)'
+
+class ExecutorError(ValueError):
+    """
+    Raised by Executor.execute (and the other Executor methods) when a
+    statement cannot be parsed or executed (syntax errors, unknown
+    tables/columns, constraint violations).
+    """
+
+# Types a '?' parameter may have (values that can be stored and logged as JSON)
+PARAM_TYPES = (type(None), bool, int, float, str)
+
+@contextmanager
+def _executor_errors():
+    """
+    Re-raises ValueErrors and TypeErrors (e.g. comparing mixed types) from
+    the parser and storage layer as ExecutorError.
+    """
+    try:
+        yield
+    except ExecutorError:
+        raise
+    except (ValueError, TypeError) as e:
+        raise ExecutorError(str(e)) from e
 
 class Executor:
-    def __init__(self, db: Database, db_file: Optional[str] = None):
+    def __init__(self, db: Database, db_file: Optional[str] = None, result_cache_size: int = 0):
+        """
+        result_cache_size: If > 0, keep up to this many SELECT results, keyed by
+        (sql, params, table versions). Cached results are returned as read-only
+        rows (a tuple of mappings) and are invalidated by any write to the table.
+        """
         self.db = db
         self.db_file = db_file
+        self.result_cache_size = result_cache_size
+        self._result_cache: "OrderedDict[Tuple, Tuple[MappingProxyType, ...]]" = OrderedDict()
+        # SQL text -> (parsed plan, placeholder count), least recently used first
+        self._plan_cache: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        # Modifications are appended to a write-ahead log next to db_file
+        self.wal = WriteAheadLog(db_file + WAL_SUFFIX) if db_file else None
+        # Unsaved modifications (statements not yet logged), and nesting depth of open transaction() blocks
+        self._dirty = False
+        self._pending: List[Dict[str, Any]] = []
+        self._tx_depth = 0
+        # Tables as they were before the open transaction first modified them
+        # (None: created by it), restored by rollback
+        self._undo: Dict[str, Optional[Tuple[Table, Tuple]]] = {}
+        # Serializes statements (and whole transactions) across threads
+        self._lock = threading.RLock()
 
-    def execute(self, sql: str) -> Union[str, List[Dict[str, Any]]]:
+    def rebind(self, db: Database, db_file: Optional[str] = None):
+        """
+        Points this executor at another database/file. Pending modifications
+        are flushed to the old file first; cached results are dropped, while
+        parsed plans (which don't depend on the data) are kept.
+        """
+        with self._lock:
+            self.flush()
+            self.db = db
+            self.db_file = db_file
+            self.wal = WriteAheadLog(db_file + WAL_SUFFIX) if db_file else None
+            self._result_cache.clear()
+
+    def _get_plan(self, sql: str) -> Tuple[Dict[str, Any], int]:
+        """
+        Returns the parsed plan for a SQL string, parsing it only on first use.
+        """
+        entry = self._plan_cache.get(sql)
+        if entry is None:
+            parsed = parse_command(sql)
+            entry = (parsed, _count_params(parsed))
+            self._plan_cache[sql] = entry
+            if len(self._plan_cache) > PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+        else:
+            self._plan_cache.move_to_end(sql)
+        return entry
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None) -> Union[str, List[Dict[str, Any]]]:
         """
         Executes a SQL command and returns the result.
         Result can be a success message string or a list of rows (for SELECT).
+        Raises ExecutorError if the statement fails.
+        
+        params: Optional values for '?' placeholders, in statement order.
+        Example: execute("SELECT * FROM users WHERE id = ?", (1,))
         """
-        try:
-            parsed = parse_command(sql)
-            command = parsed['command']
+        with self._lock:
+            with _executor_errors():
+                parsed = self._bind(sql, params)
+                result = self._dispatch(parsed, sql, params)
             
-            result = None
-            modified = False
+            # Auto-Save if modified: immediately, or once when the enclosing transaction ends
+            if self._dirty and not self._tx_depth:
+                self.flush()
             
-            if command == 'CREATE_TABLE':
-                result = self._execute_create_table(parsed)
-                modified = True
-            elif command == 'INSERT':
-                result = self._execute_insert(parsed)
-                modified = True
-            elif command == 'SELECT':
-                result = self._execute_select(parsed)
-            elif command == 'UPDATE':
-                result = self._execute_update(parsed)
-                modified = True
-            elif command == 'DELETE':
-                result = self._execute_delete(parsed)
-                modified = True
-            elif command == 'DROP_TABLE':
-                result = self._execute_drop_table(parsed)
-                modified = True
-            else:
-                raise ValueError(f"Unsupported command: {command}")
+            return result
+
+    def row_iter(self, sql: str, params: Optional[Sequence[Any]] = None) -> Union[str, Iterator[Dict[str, Any]]]:
+        """
+        Like execute, but a plain single-table SELECT returns an iterator
+        that builds each row only when it is reached (see Table.iter_select),
+        so large results are never held in memory as one list. Other
+        statements return what execute returns.
+        """
+        with self._lock:
+            with _executor_errors():
+                parsed = self._bind(sql, params)
+                if (parsed['command'] == 'SELECT' and not parsed.get('join') and not self.result_cache_size
+                        and not _is_count(parsed)):
+                    return self.db.get_table(parsed['table']).iter_select(parsed['columns'], parsed['where'])
+            return self.execute(sql, params)
+
+    def execute_many(self, sql: str, param_list: Sequence[Sequence[Any]]) -> str:
+        """
+        Executes one parameterized statement for every parameter tuple.
+        The template is parsed once and the batch is saved once; INSERT
+        batches go through Table.insert_many, validating all rows before
+        writing any. Raises ExecutorError if any statement fails.
+        
+        Example:
+            execute_many("INSERT INTO users VALUES (?, ?)", [(1, 'Alice'), (2, 'Bob')])
+        """
+        with self._lock, self.transaction(), _executor_errors():
+            bound = [self._bind(sql, params) for params in param_list]
+            if not bound:
+                return "0 rows affected."
             
-            # Auto-Save if modified and file is set
-            if modified and self.db_file:
+            if bound[0]['command'] == 'INSERT':
+                table_name = bound[0]['table']
+                self._before_write(table_name)
+                rows = [plan['values'] for plan in bound]
+                count = self.db.get_table(table_name).insert_many(rows)
+                self._record({'command': 'INSERT_MANY', 'table': table_name, 'rows': rows})
+                return f"{count} rows inserted."
+            
+            for plan, params in zip(bound, param_list):
+                self._dispatch(plan, sql, params)
+            return f"{len(bound)} statements executed."
+
+    def _bind(self, sql: str, params: Optional[Sequence[Any]]) -> Dict[str, Any]:
+        """
+        Returns the (cached) plan for sql with params bound to its placeholders.
+        """
+        parsed, n_params = self._get_plan(sql)
+        given = len(params) if params is not None else 0
+        if given != n_params:
+            raise ValueError(f"Statement expects {n_params} parameters, got {given}")
+        for value in params or ():
+            if type(value) not in PARAM_TYPES:
+                raise ValueError(f"Unsupported parameter type: {type(value).__name__}")
+        if n_params:
+            parsed = _bind_params(parsed, params)
+        return parsed
+
+    def _dispatch(self, parsed: Dict[str, Any], sql: str, params: Optional[Sequence[Any]]) -> Union[str, List[Dict[str, Any]]]:
+        """
+        Runs one bound plan; modifications are recorded for the next flush.
+        """
+        command = parsed['command']
+        
+        if command == 'SELECT':
+            if self.result_cache_size > 0:
+                return self._execute_select_cached(parsed, sql, params)
+            return self._execute_select(parsed)
+        
+        self._before_write(parsed['table'])
+        if command == 'CREATE_TABLE':
+            result = self._execute_create_table(parsed)
+        elif command == 'INSERT':
+            result = self._execute_insert(parsed)
+        elif command == 'UPDATE':
+            result = self._execute_update(parsed)
+        elif command == 'DELETE':
+            result = self._execute_delete(parsed)
+        elif command == 'DROP_TABLE':
+            result = self._execute_drop_table(parsed)
+        else:
+            raise ValueError(f"Unsupported command: {command}")
+        
+        self._record(parsed)
+        return result
+
+    def _before_write(self, table_name: str):
+        """
+        Inside a transaction, checkpoints a table before its first
+        modification so rollback can restore it.
+        """
+        if self._tx_depth and table_name not in self._undo:
+            table = self.db.tables.get(table_name)
+            self._undo[table_name] = None if table is None else (table, table.checkpoint())
+
+    def _record(self, entry: Dict[str, Any]):
+        """
+        Marks the database modified and queues the statement for the write-ahead log.
+        """
+        self._dirty = True
+        if self.wal:
+            self._pending.append(entry)
+
+    def flush(self):
+        """
+        Persists unsaved modifications.
+        Pending statements are appended to the write-ahead log; the full
+        snapshot is rewritten only when none exists yet or the log has grown
+        larger than it (compaction). If another process changed the file
+        since it was loaded, it is reloaded first (see _reapply_on_reload).
+        """
+        with self._lock:
+            if self._dirty and self.db_file:
+                try:
+                    with file_lock(self.db_file):
+                        if os.path.exists(self.db_file):
+                            if self.db.is_stale(self.db_file):
+                                self._reapply_on_reload()
+                            self.wal.append(self._pending)
+                            # Logged: these entries must never be appended again
+                            self._pending.clear()
+                            self._dirty = False
+                            self.db.mark_synced(self.db_file)
+                            if self.wal.size() > os.path.getsize(self.db_file):
+                                self._try_compact()
+                        else:
+                            self.db.save_to_file(self.db_file)
+                except OSError as e:
+                    raise ExecutorError(f"Could not save '{self.db_file}': {e}") from e
+            self._pending.clear()
+            self._dirty = False
+
+    def _try_compact(self):
+        """
+        Compacts after a log append. The log already holds every change, so a
+        failed snapshot rewrite only warns; the next flush retries it.
+        """
+        try:
+            self.compact()
+        except OSError as e:
+            warnings.warn(f"Compaction of '{self.db_file}' failed, keeping the log: {e}")
+
+    def _reapply_on_reload(self):
+        """
+        Reloads the file another process has written to and re-applies the
+        pending statements on top, so they are logged after that process's
+        changes instead of conflicting with them. If one no longer applies
+        (e.g. both processes inserted the same id), all pending statements
+        are discarded and ExecutorError is raised. Called under the file lock.
+        """
+        pending = list(self._pending)
+        self.db.load_from_file(self.db_file)
+        try:
+            for entry in pending:
+                self.db.apply_log_entry(entry)
+        except ValueError as e:
+            self.db.load_from_file(self.db_file)
+            self._pending.clear()
+            self._dirty = False
+            raise ExecutorError(f"Unsaved changes conflict with changes another process made to "
+                                f"'{self.db_file}' and were discarded: {e}") from e
+
+    def compact(self):
+        """
+        Rewrites the snapshot from memory and discards the write-ahead log.
+        """
+        with self._lock:
+            if self.db_file:
                 self.db.save_to_file(self.db_file)
-                
-            return result
-                
-        except Exception as e:
-            return f"Error: {str(e)}"
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups several statements into a single save.
+        Auto-save is deferred until the outermost block exits; if an exception
+        escapes the block, its modifications are rolled back instead (each
+        table is checkpointed before the block first modifies it).
+        
+        Example:
+            with executor.transaction():
+                executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+                executor.execute("INSERT INTO users VALUES (2, 'Bob')")
+        """
+        with self._lock:
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if self._tx_depth == 1:
+                    self.rollback()
+                raise
+            finally:
+                self._tx_depth -= 1
+                if not self._tx_depth:
+                    self._undo.clear()
+                    self.flush()
+
+    def rollback(self):
+        """
+        Discards the modifications of the open transaction: every table it
+        modified is restored from its checkpoint and tables it created are
+        dropped, for in-memory and file-backed databases alike. Called
+        automatically when an exception escapes transaction().
+        """
+        with self._lock:
+            for name, saved in self._undo.items():
+                if saved is None:
+                    self.db.tables.pop(name, None)
+                else:
+                    table, checkpoint = saved
+                    table.restore(checkpoint)
+                    self.db.tables[name] = table
+            self._undo.clear()
+            self._pending.clear()
+            self._dirty = False
+
+    def create_index(self, table_name: str, index_name: str, column: str, prefix_length: Optional[int] = None) -> str:
+        """
+        Creates a named secondary index (see Table.create_index) and persists it
+        like any other schema change.
+        """
+        with self._lock:
+            with _executor_errors():
+                table = self.db.get_table(table_name)
+                self._before_write(table_name)
+                table.create_index(index_name, column, prefix_length)
+            self._record({
+                'command': 'CREATE_INDEX',
+                'table': table_name,
+                'name': index_name,
+                'column': column,
+                'prefix_length': prefix_length
+            })
+            if not self._tx_depth:
+                self.flush()
+            return f"Index '{index_name}' created."
+
+    def lookup_by(self, table_name: str, index_name: str, key: Any) -> List[Dict[str, Any]]:
+        """
+        Returns the rows of a table whose key in a secondary index equals key.
+        """
+        with self._lock, _executor_errors():
+            return self.db.get_table(table_name).lookup_by(index_name, key)
+
+    def aggregate(self, table_name: str, func: str, column: str, where: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Returns SUM/MIN/MAX/AVG/COUNT of a table column without building rows.
+        """
+        with self._lock, _executor_errors():
+            return self.db.get_table(table_name).aggregate(func, column, where)
+
+    def allocate_id(self, table_name: str) -> int:
+        """
+        Returns the next free integer primary key for a table without scanning it.
+        """
+        with self._lock, _executor_errors():
+            return self.db.get_table(table_name).allocate_id()
+
+    def warmup(self, sqls: Sequence[str]):
+        """
+        Runs read-only statements once so their plans (and, if enabled, their
+        results) are cached before the first real request. Statements on
+        tables that do not exist yet are skipped.
+        """
+        for sql in sqls:
+            try:
+                self.execute(sql)
+            except ExecutorError:
+                pass
 
     def _execute_create_table(self, parsed: Dict[str, Any]) -> str:
         name = parsed['table']
@@ -62,7 +422,8 @@ class Executor:
         values = parsed['values']
         
         table = self.db.get_table(table_name)
-        table.insert_row(values)
+        # Copy: the plan (and its values list) may be cached and re-executed
+        table.insert_row(list(values))
         return "1 row inserted."
 
     def _execute_select(self, parsed: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -73,6 +434,11 @@ class Executor:
         
         table = self.db.get_table(table_name)
         
+        # COUNT(*): one row holding the count, e.g. [{'COUNT(*)': 3}]
+        count_key = columns[0] if _is_count(parsed) else None
+        if count_key and not join_info:
+            return [{count_key: table.count(where)}]
+        
         if join_info:
             join_table_name = join_info['table']
             other_table = self.db.get_table(join_table_name)
@@ -134,10 +500,34 @@ class Executor:
             if not final_left or not final_right:
                  raise ValueError("Could not resolve JOIN columns. Please use fully qualified names (table.col).")
                  
+            if count_key:
+                return [{count_key: len(table.inner_join(other_table, final_left, final_right, None, where))}]
             return table.inner_join(other_table, final_left, final_right, columns, where)
             
         return table.select(columns, where)
 
+    def _execute_select_cached(self, parsed: Dict[str, Any], sql: str, params: Optional[Sequence[Any]]) -> Tuple[MappingProxyType, ...]:
+        """
+        SELECT through the result cache. Any modification bumps the table's
+        version, so stale entries are simply never looked up again and age out.
+        """
+        table_names = [parsed['table']]
+        if parsed.get('join'):
+            table_names.append(parsed['join']['table'])
+        versions = tuple(self.db.get_table(name).version for name in table_names)
+        key = (sql, tuple(params) if params else None, versions)
+        
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            self._result_cache.move_to_end(key)
+            return cached
+        
+        result = tuple(MappingProxyType(row) for row in self._execute_select(parsed))
+        self._result_cache[key] = result
+        if len(self._result_cache) > self.result_cache_size:
+            self._result_cache.popitem(last=False)
+        return result
+
     def _execute_update(self, parsed: Dict[str, Any]) -> str:
         table_name = parsed['table']
         set_values = parsed['set']
@@ -1,14 +1,22 @@
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Union
+
+# Shared result for lookups that find nothing (avoids allocating a new set per miss)
+_EMPTY: frozenset = frozenset()
 
 class Index:
     """
     Hash-based index implementation.
-    Maps values to a set of row indices.
+    Maps values to row indices.
+
+    Unique indexes store the row index directly (value -> int);
+    non-unique indexes store a set of row indices (value -> Set[int]).
     """
+    __slots__ = ('name', 'unique', 'data')
+
     def __init__(self, name: str, unique: bool = False):
         self.name = name
         self.unique = unique
-        self.data: Dict[Any, Set[int]] = {}
+        self.data: Dict[Any, Union[int, Set[int]]] = {}
 
     def insert(self, value: Any, row_index: int):
         """
@@ -18,22 +26,61 @@ class Index:
         if self.unique:
             if value in self.data:
                  raise ValueError(f"Constraint Violation: Unique constraint violated on index '{self.name}' (value: {value})")
-            self.data[value] = {row_index}
+            self.data[value] = row_index
         else:
             if value not in self.data:
                 self.data[value] = set()
             self.data[value].add(row_index)
 
+    def bulk_load(self, values: Sequence[Any], row_indices: Iterable[int]):
+        """
+        Insert many (value, row_index) pairs in one pass.
+        For unique indexes the whole batch is validated before anything is written.
+        """
+        if self.unique:
+            new_entries = dict(zip(values, row_indices))
+            if len(new_entries) != len(values) or not self.data.keys().isdisjoint(new_entries):
+                raise ValueError(f"Constraint Violation: Unique constraint violated on index '{self.name}'")
+            self.data.update(new_entries)
+        else:
+            data = self.data
+            for value, row_index in zip(values, row_indices):
+                bucket = data.get(value)
+                if bucket is None:
+                    data[value] = {row_index}
+                else:
+                    bucket.add(row_index)
+
     def delete(self, value: Any, row_index: int):
         """
         Remove a row index for a given value.
         """
         if value in self.data:
-            if row_index in self.data[value]:
+            if self.unique:
+                if self.data[value] == row_index:
+                    del self.data[value]
+            elif row_index in self.data[value]:
                 self.data[value].remove(row_index)
                 if not self.data[value]:
                     del self.data[value]
 
+    def bulk_delete(self, values: Iterable[Any], row_indices: Iterable[int]):
+        """
+        Remove many (value, row_index) pairs in one pass.
+        """
+        data = self.data
+        if self.unique:
+            for value, row_index in zip(values, row_indices):
+                if data.get(value) == row_index:
+                    del data[value]
+        else:
+            for value, row_index in zip(values, row_indices):
+                bucket = data.get(value)
+                if bucket is not None:
+                    bucket.discard(row_index)
+                    if not bucket:
+                        del data[value]
+
     def update(self, old_value: Any, new_value: Any, row_index: int):
         """
         Update a value in the index.
@@ -48,8 +95,60 @@ class Index:
         self.delete(old_value, row_index)
         self.insert(new_value, row_index)
 
+    def key(self, value: Any) -> Any:
+        """
+        Maps a column value to its index key (the value itself).
+        """
+        return value
+
+    def get(self, value: Any) -> Optional[int]:
+        """
+        Returns the row index for a value in a unique index, or None.
+        """
+        return self.data.get(value)
+
     def lookup(self, value: Any) -> Set[int]:
         """
         Returns a set of row indices for the given value.
         """
-        return self.data.get(value, set())
+        entry = self.data.get(value)
+        if entry is None:
+            return _EMPTY
+        if self.unique:
+            return frozenset((entry,))
+        return entry
+
+class SecondaryIndex(Index):
+    """
+    Named, non-unique index on a table column, optionally keyed on the first
+    `prefix_length` characters of text values (e.g. prefix_length=10 buckets
+    'YYYY-MM-DD HH:MM' timestamps by day).
+
+    insert/delete take raw column values; lookup takes the key (the prefix).
+    """
+    __slots__ = ('column', 'prefix_length')
+
+    def __init__(self, name: str, column: str, prefix_length: Optional[int] = None):
+        super().__init__(name, unique=False)
+        self.column = column
+        self.prefix_length = prefix_length
+
+    def key(self, value: Any) -> Any:
+        """
+        Maps a column value to its index key.
+        """
+        if self.prefix_length is not None and isinstance(value, str):
+            return value[:self.prefix_length]
+        return value
+
+    def insert(self, value: Any, row_index: int):
+        super().insert(self.key(value), row_index)
+
+    def delete(self, value: Any, row_index: int):
+        super().delete(self.key(value), row_index)
+
+    def bulk_load(self, values: Sequence[Any], row_indices: Iterable[int]):
+        super().bulk_load([self.key(v) for v in values], row_indices)
+
+    def bulk_delete(self, values: Iterable[Any], row_indices: Iterable[int]):
+        super().bulk_delete([self.key(v) for v in values], row_indices)
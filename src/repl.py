@@ -1,5 +1,7 @@
 import sys
-from typing import List, Dict, Any
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Any, Iterable, List
 
 # Assuming these are importable from src
 # When running main.py from root, these imports need to be handled correctly
@@ -10,18 +12,47 @@ from typing import List, Dict, Any
 
 try:
     from .storage import Database
-    from .executor import Executor
+    from .executor import Executor, ExecutorError
 except ImportError:
     # Fallback for direct execution
     from storage import Database
-    from executor import Executor
+    from executor import Executor, ExecutorError
 
 import os
 import sys
-import glob
+import time
 
 # ... (Imports)
 
+# .describe constraint column, keyed by (is primary key, is unique)
+_CONSTRAINT_TAGS = {
+    (False, False): "",
+    (True, False): "[PK]",
+    (False, True): "[UNIQUE]",
+    (True, True): "[PK, UNIQUE]",
+}
+
+# Seconds a .databases directory listing is reused
+DATABASES_SCAN_TTL = 1.0
+
+HELP_TEXT = """Available commands:
+  .tables               List all tables
+  .describe <table_name> Show table schema
+  .databases            Show available .josedb files
+  .open <filename>      Open/Create a database file
+  .exit                 Exit the REPL
+  <SQL>;                Execute SQL (must end with ;)
+"""
+
+# Rows examined to size the columns before printing starts
+PRINT_BATCH_SIZE = 1024
+# Table lines joined into a single stdout write
+WRITE_BATCH_SIZE = 4096
+
+def _write_lines(lines: List[str]):
+    """Writes lines to stdout in a single call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
 class REPL:
     def __init__(self, filename: str = None):
         self.db = Database()
@@ -30,6 +61,11 @@ class REPL:
         if self.filename:
             if os.path.exists(self.filename):
                 try:
+                    # Large files take a moment: say so up front. Keys typed
+                    # meanwhile stay in the terminal's input queue and are
+                    # read by the first prompt.
+                    if sys.stdout.isatty():
+                        print(f"Loading '{self.filename}'...", end="\r", flush=True)
                     self.db.load_from_file(self.filename)
                     print(f"Loaded database from '{self.filename}'")
                 except Exception as e:
@@ -38,13 +74,23 @@ class REPL:
                 print(f"Database file '{self.filename}' will be created on first write.")
                 
         self.executor = Executor(self.db, self.filename)
-        self.buffer = ""
+        # Lines of the statement being entered (not yet terminated by ';')
+        self.buffer_parts: List[str] = []
+        # (scan time, file names) from the last .databases listing
+        self._db_files_scan = (float('-inf'), [])
 
     def start(self):
+        # Piped input (scripts): read it all at once, no prompts or echo
+        if not sys.stdin.isatty():
+            self.run_script(sys.stdin.read())
+            return
+        
         print("Welcome to MyDB. Type .help for instructions.")
         print("Type .exit to quit.")
         
-        # Try to enable readline usage for history if available
+        # Try to enable readline usage for history if available.
+        # Interactive sessions only: scripts returned above, so piped input
+        # never pays for readline's per-line editing and history.
         try:
             import readline
         except ImportError:
@@ -52,45 +98,82 @@ class REPL:
 
         while True:
             try:
-                prompt = "mydb> " if not self.buffer else "   -> "
+                prompt = "mydb> " if not self.buffer_parts else "   -> "
                 try:
                     line = input(prompt)
                 except EOFError:
                     print()
                     break
 
-                if not line and not self.buffer:
-                    continue
-                    
-                # Meta commands handling (only on fresh line)
-                if line.strip().startswith(".") and not self.buffer:
-                    self.handle_meta_command(line.strip())
-                    continue
-                
-                # SQL Accumulation
-                # Add space to avoid concatenation issues like "SELECT * FROM" + "table" -> "FROMtable"
-                self.buffer += line + " "
-                
-                # Check for semi-colon to execute
-                if ";" in self.buffer:
-                    # Execute
-                    # Split by ; to handle multiple commands
-                    commands = [c.strip() for c in self.buffer.split(';') if c.strip()]
-                    
-                    for sql in commands:
-                        if not sql: continue
-                        print(f"Executing: {sql}")
-                        result = self.executor.execute(sql)
-                        self.print_result(result)
-                        
-                    self.buffer = ""
+                self.handle_line(line)
                     
             except KeyboardInterrupt:
                 print("\nType .exit to quit.")
-                self.buffer = ""
+                self.buffer_parts = []
+            except Exception as e:
+                print(f"Error: {e}")
+                self.buffer_parts = []
+
+    def run_script(self, data: str):
+        """
+        Runs a script's lines (meta commands and SQL) without prompting.
+        A final statement without its ';' is still run at the end of input.
+        """
+        # The closing ';' completes a trailing unterminated statement (and is
+        # a no-op after a complete one)
+        for line in data.splitlines() + [";"]:
+            try:
+                self.handle_line(line, echo=False)
             except Exception as e:
                 print(f"Error: {e}")
-                self.buffer = ""
+                self.buffer_parts = []
+
+    def handle_line(self, line: str, echo: bool = True):
+        """
+        Processes one input line: runs a meta command, or adds the line to the
+        SQL buffer and executes every statement once a ';' is seen.
+        echo: print each statement before running it (interactive mode).
+        """
+        if not line and not self.buffer_parts:
+            return
+            
+        # Meta commands handling (only on fresh line)
+        if line.strip().startswith(".") and not self.buffer_parts:
+            self.handle_meta_command(line.strip())
+            return
+        
+        # SQL Accumulation (lines are joined with a space only once a statement
+        # completes, to avoid concatenation issues like "FROM" + "table" -> "FROMtable")
+        self.buffer_parts.append(line)
+        # Earlier buffered lines hold no ';', so only the new line can complete a statement
+        if ";" not in line:
+            return
+        
+        buffer = " ".join(self.buffer_parts)
+        self.buffer_parts = []
+        
+        # Execute each complete (';'-terminated) statement; the rest stays buffered
+        start = 0
+        while True:
+            end = buffer.find(';', start)
+            if end < 0:
+                break
+            sql = buffer[start:end].strip()
+            start = end + 1
+            if not sql:
+                continue
+            if echo:
+                print(f"Executing: {sql}")
+            try:
+                result = self.executor.row_iter(sql)
+            except ExecutorError as e:
+                print(f"Error: {e}")
+                continue
+            self.print_result(result)
+        
+        rest = buffer[start:]
+        if rest.strip():
+            self.buffer_parts.append(rest)
 
     def handle_meta_command(self, command: str):
         parts = command.split()
@@ -101,11 +184,10 @@ class REPL:
             sys.exit(0)
         elif cmd == ".tables":
             # ... (as before)
-            print("Tables:")
+            lines = ["Tables:"] + [f"  - {name}" for name in self.db.tables]
             if not self.db.tables:
-                print("  (no tables)")
-            for name in self.db.tables:
-                print(f"  - {name}")
+                lines.append("  (no tables)")
+            _write_lines(lines)
         elif cmd == ".describe":
             # ... (as before - reusing logic)
             if len(parts) < 2:
@@ -116,24 +198,19 @@ class REPL:
             table_name = parts[1]
             try:
                 table = self.db.get_table(table_name)
-                print(f"Table: {table.name}")
-                print(f"Primary Key: {table.primary_key}")
-                print("Columns:")
-                for col_name, col_type in table.columns:
-                    constraints = []
-                    if col_name == table.primary_key:
-                        constraints.append("PK")
-                    if col_name in table.unique_columns:
-                        constraints.append("UNIQUE")
-                        
-                    constr_str = f"[{', '.join(constraints)}]" if constraints else ""
-                    print(f"  - {col_name} ({col_type}) {constr_str}")
+                lines = [f"Table: {table.name}", f"Primary Key: {table.primary_key}", "Columns:"]
+                pk = table.primary_key
+                unique = frozenset(table.unique_columns)
+                line = "  - {} ({}) {}".format
+                lines.extend(line(col_name, col_type, _CONSTRAINT_TAGS[col_name == pk, col_name in unique])
+                             for col_name, col_type in table.columns)
+                _write_lines(lines)
             except ValueError as e:
                 print(f"Error: {e}")
 
         elif cmd == ".databases":
             print("Available DataBases (.josedb files):")
-            files = glob.glob("*.josedb")
+            files = self._database_files()
             if not files:
                 print("  (none found)")
             for f in files:
@@ -146,11 +223,11 @@ class REPL:
                 return
             new_filename = parts[1]
             try:
-                # Save current if needed? Executor auto-saves, so internal state is synced to file.
-                # But if we rename 'self.filename', we switch context.
+                # Executor auto-saves, but write out anything still pending for the current file
+                self.executor.flush()
                 
-                # 1. Reset DB in memory to avoid mixing data
-                self.db = Database()
+                # 1. Reset DB in memory (in place) to avoid mixing data
+                self.db.reset()
                 
                 # 2. Check if file exists to load
                 if os.path.exists(new_filename):
@@ -159,57 +236,89 @@ class REPL:
                 else:
                     print(f"Created new database '{new_filename}'")
                 
-                # 3. bind new executor
+                # 3. point the executor at the new file (keeps its parsed-plan cache)
                 self.filename = new_filename
-                self.executor = Executor(self.db, self.filename)
+                self.executor.rebind(self.db, self.filename)
+                self._db_files_scan = (float('-inf'), [])
                 
             except Exception as e:
                 print(f"Error opening '{new_filename}': {e}")
+                # Don't let later writes land in the previous file
+                self.db.reset()
+                self.filename = None
+                self.executor.rebind(self.db, None)
+                print("Continuing with an empty in-memory database.")
 
         elif cmd == ".help":
-            print("Available commands:")
-            print("  .tables               List all tables")
-            print("  .describe <table_name> Show table schema")
-            print("  .databases            Show available .josedb files")
-            print("  .open <filename>      Open/Create a database file")
-            print("  .exit                 Exit the REPL")
-            print("  <SQL>;                Execute SQL (must end with ;)")
+            sys.stdout.write(HELP_TEXT)
         else:
             print(f"Unknown command: {command}")
 
+    def _database_files(self) -> List[str]:
+        """
+        .josedb files in the current directory, from one os.scandir pass.
+        Reused for DATABASES_SCAN_TTL seconds so repeated listings skip the scan.
+        """
+        scanned_at, files = self._db_files_scan
+        now = time.monotonic()
+        if now - scanned_at >= DATABASES_SCAN_TTL:
+            with os.scandir(".") as entries:
+                files = [e.name for e in entries if e.name.endswith(".josedb") and e.is_file()]
+            self._db_files_scan = (now, files)
+        return files
+
     def print_result(self, result: Any):
         if isinstance(result, str):
             print(result)
-        elif isinstance(result, list):
+        elif isinstance(result, (list, tuple)) or hasattr(result, '__next__'):
             self.print_table(result)
         else:
             print(result)
             
-    def print_table(self, rows: List[Dict[str, Any]]):
-        if not rows:
+    def print_table(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Prints rows as they are consumed. Column widths come from the first
+        PRINT_BATCH_SIZE rows; a longer value further down just widens its own line.
+        """
+        rows = iter(rows)
+        first = list(islice(rows, PRINT_BATCH_SIZE))
+        if not first:
             print("(0 rows)")
             return
             
         # Get headers
-        headers = list(rows[0].keys())
+        headers = list(first[0].keys())
+        
+        getters = [itemgetter(h) for h in headers]
+        
+        def render(batch):
+            # Column-major buffer: every cell is stringified exactly once
+            return [list(map(str, map(get, batch))) for get in getters]
         
-        # Calculate widths
-        widths = {h: len(h) for h in headers}
-        for row in rows:
-            for h in headers:
-                val = str(row.get(h, ''))
-                widths[h] = max(widths[h], len(val))
+        # Calculate widths (map/max run the per-cell work in C)
+        cols = render(first)
+        widths = [max(len(h), max(map(len, col))) for h, col in zip(headers, cols)]
         
         # Print header
-        header_parts = [h.ljust(widths[h]) for h in headers]
+        header_parts = [h.ljust(w) for h, w in zip(headers, widths)]
         header_row = " | ".join(header_parts)
-        separator = "-+-".join(["-" * widths[h] for h in headers])
+        separator = "-+-".join(["-" * w for w in widths])
         
         print(header_row)
         print(separator)
         
-        # Print rows
-        for row in rows:
-            row_parts = [str(row.get(h, '')).ljust(widths[h]) for h in headers]
-            print(" | ".join(row_parts))
-        print(f"({len(rows)} rows)")
+        # Print rows, one write per batch (up to WRITE_BATCH_SIZE lines).
+        # The cells are already strings: format() of e.g. True with a width
+        # spec would print it as 1.
+        fmt = " | ".join(f"{{:<{w}}}" for w in widths).format
+        write = sys.stdout.write
+        count = 0
+        n = len(first)
+        while n:
+            lines = [fmt(*cells) for cells in zip(*cols)]
+            write("\n".join(lines) + "\n")
+            count += n
+            batch = list(islice(rows, WRITE_BATCH_SIZE))
+            n = len(batch)
+            cols = render(batch)
+        print(f"({count} rows)")
@@ -1,17 +1,88 @@
 import re
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Pattern
+
+class Placeholder:
+    """
+    Marker for a positional '?' parameter in a parsed statement.
+    The executor substitutes bound values for it in statement order.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return '?'
+
+PLACEHOLDER = Placeholder()
+
+# Number of distinct statements whose parse results are memoized
+PARSE_CACHE_SIZE = 512
+
+# Statement patterns, compiled once at import.
+# Each is matched against the whole (stripped) statement with fullmatch, so
+# trailing text is rejected instead of silently ignored.
+_CREATE_RE = re.compile(r"CREATE\s+TABLE\s+(?P<table>\w+)\s*\((?P<columns>.*)\)", re.IGNORECASE | re.DOTALL)
+_INSERT_RE = re.compile(r"INSERT\s+INTO\s+(?P<table>\w+)\s+VALUES\s*\((?P<values>.+)\)", re.IGNORECASE)
+# Note: Using non-greedy match for columns/tables.
+_SELECT_RE = re.compile(
+    r"SELECT\s+(?P<cols>.+?)\s+FROM\s+(?P<table>\w+)"
+    r"(?:\s+JOIN\s+(?P<join_table>\w+)\s+ON\s+(?P<join_on>.+?))?"
+    r"(?:\s+WHERE\s+(?P<where>.+))?",
+    re.IGNORECASE)
+# No column list or JOIN (a JOIN falls through to _SELECT_RE)
+_SELECT_STAR_RE = re.compile(r"SELECT \* FROM (?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+))?", re.IGNORECASE)
+_UPDATE_RE = re.compile(r"UPDATE\s+(?P<table>\w+)\s+SET\s+(?P<set>.+?)(?:\s+WHERE\s+(?P<where>.+))?", re.IGNORECASE)
+_DELETE_RE = re.compile(r"DELETE\s+FROM\s+(?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+))?", re.IGNORECASE)
+_DROP_RE = re.compile(r"DROP\s+TABLE\s+(?P<table>\w+)", re.IGNORECASE)
+
+# Clause helpers
+_ON_RE = re.compile(r"(.+?)\s*=\s*(.+)")
+# One `col = value` pair and the delimiter after it: WHERE pairs are joined
+# by AND, SET pairs by commas. A quoted value may contain the delimiter.
+_WHERE_PAIR_RE = re.compile(r"\s*([\w\.]+)\s*=\s*('[^']*'|.+?)\s*(?:\s+AND\s+|$)", re.IGNORECASE)
+_SET_PAIR_RE = re.compile(r"\s*([\w\.]+)\s*=\s*('[^']*'|.+?)\s*(?:,|$)")
+
+_BOOLS = {'true': True, 'false': False, 'True': True, 'False': False, 'TRUE': True, 'FALSE': False}
+
+def _coerce(v: str) -> Any:
+    """
+    Converts a literal from a statement to its Python value:
+    ? -> PLACEHOLDER, 'text' -> str, integers -> int, true/false -> bool,
+    other numbers -> float. Anything else is returned unchanged.
+    """
+    if v == '?':
+        return PLACEHOLDER
+    # Classify on the first character, so each literal takes one branch
+    c = v[:1]
+    if c == "'":
+        if v.endswith("'"):
+            return v[1:-1]
+    elif c == '-' or '0' <= c <= '9':
+        if '.' not in v:
+            try:
+                return int(v)
+            except ValueError:
+                pass
+    elif c and c in 'tTfF':
+        b = _BOOLS.get(v)
+        if b is None and len(v) in (4, 5):
+            b = _BOOLS.get(v.lower())
+        if b is not None:
+            return b
+    try:
+        return float(v)
+    except ValueError:
+        return v
 
 def parse_create_table(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: CREATE TABLE table_name (col1 TYPE constr, ...)
     """
-    pattern = r"CREATE\s+TABLE\s+(\w+)\s*\((.+)\)"
-    match = re.search(pattern, sql, re.IGNORECASE | re.DOTALL)
+    match = _CREATE_RE.fullmatch(sql.strip())
     if not match:
         raise ValueError("Invalid CREATE TABLE syntax")
     
-    table_name = match.group(1)
-    columns_def = match.group(2)
+    table_name = match.group('table')
+    columns_def = match.group('columns')
     
     columns = []
     primary_key = None
@@ -48,83 +119,63 @@ def parse_create_table(sql: str) -> Dict[str, Any]:
         "unique_columns": unique_columns
     }
 
-def _parse_key_value_pairs(clause_str: str, delimiter_regex: str) -> Dict[str, Any]:
+def _parse_key_value_pairs(clause_str: str, pair: Pattern) -> Dict[str, Any]:
     """
-    Parses key-value pairs separated by a delimiter.
+    Parses key-value pairs separated by a delimiter, matching `pair`
+    (_WHERE_PAIR_RE or _SET_PAIR_RE) once per pair from left to right.
     Example: "col1 = val1, col2 = val2" or "col1=val1 AND col2=val2"
     """
     if not clause_str:
         return None
     
     conditions = {}
-    parts = re.split(delimiter_regex, clause_str, flags=re.IGNORECASE)
+    pos = 0
+    end = len(clause_str.rstrip())
     
-    for part in parts:
-        if not part.strip():
-            continue
-            
-        m = re.match(r"([\w\.]+)\s*=\s*(.+)", part.strip())
+    while pos < end:
+        m = pair.match(clause_str, pos)
         if not m:
-             raise ValueError(f"Invalid condition: {part}")
-        
-        col = m.group(1)
-        val_str = m.group(2).strip()
-        
-        if val_str.startswith("'") and val_str.endswith("'"):
-            val = val_str[1:-1]
-        elif val_str.lower() == 'true':
-            val = True
-        elif val_str.lower() == 'false':
-            val = False
-        elif val_str.isdigit():
-            val = int(val_str)
-        else:
-            try:
-                val = float(val_str)
-            except ValueError:
-                val = val_str
-                
-        conditions[col] = val
+             raise ValueError(f"Invalid condition: {clause_str[pos:].strip()}")
+        conditions[m.group(1)] = _coerce(m.group(2))
+        pos = m.end()
         
     return conditions
 
+def _split_key_value_pairs(clause_str: str, delimiter: str) -> Dict[str, Any]:
+    """
+    Same result as _parse_key_value_pairs for clauses with no quoted values,
+    using str.split/partition instead of the regex engine.
+    """
+    conditions = {}
+    for part in [p for p in clause_str.split(delimiter) if p.strip()]:
+        col, eq, val_str = part.partition('=')
+        col = col.strip()
+        val_str = val_str.strip()
+        if not eq or not val_str or not col.replace('.', '').replace('_', '').isalnum():
+             raise ValueError(f"Invalid condition: {part.strip()}")
+        conditions[col] = _coerce(val_str)
+    return conditions
+
 def _parse_where(where_str: str) -> Dict[str, Any]:
     """
     Parses WHERE clause: col1 = val1 AND col2 = val2
     """
-    return _parse_key_value_pairs(where_str, r'\s+AND\s+')
+    return _parse_key_value_pairs(where_str, _WHERE_PAIR_RE)
 
 def parse_insert(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: INSERT INTO table_name VALUES (val1, val2, ...)
     """
-    pattern = r"INSERT\s+INTO\s+(\w+)\s+VALUES\s*\((.+)\)"
-    match = re.search(pattern, sql, re.IGNORECASE)
+    match = _INSERT_RE.fullmatch(sql.strip())
     if not match:
          raise ValueError("Invalid INSERT syntax")
          
-    table_name = match.group(1)
-    values_str = match.group(2)
+    table_name = match.group('table')
+    values_str = match.group('values')
     
     # Split by comma, handling whitespace
-    raw_values = [v.strip() for v in values_str.split(',')]
-    values = []
+    values = [_coerce(v.strip()) for v in values_str.split(',')]
     
-    for v in raw_values:
-        if v.startswith("'") and v.endswith("'"):
-            values.append(v[1:-1])
-        elif v.lower() == 'true':
-            values.append(True)
-        elif v.lower() == 'false':
-            values.append(False)
-        elif v.isdigit():
-            values.append(int(v))
-        else:
-            try:
-                values.append(float(v))
-            except ValueError:
-                 values.append(v)
-                 
     return {
         "command": "INSERT",
         "table": table_name,
@@ -135,24 +186,29 @@ def parse_select(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: SELECT col1, col2, ... FROM table [JOIN table2 ON condition] [WHERE condition]
     """
-    # Regex groups:
-    # 1. Columns
-    # 2. Main Table
-    # 3. Join Table (Optional)
-    # 4. Join Condition (Optional)
-    # 5. Where Clause (Optional)
+    sql = sql.strip()
+    
+    # Fast path for the common `SELECT * FROM table [WHERE ...]`
+    if sql[:14].upper() == "SELECT * FROM ":
+        match = _SELECT_STAR_RE.fullmatch(sql)
+        if match:
+            return {
+                "command": "SELECT",
+                "table": match.group('table'),
+                "columns": None,
+                "where": _parse_where(match.group('where')),
+                "join": None
+            }
     
-    # Note: Regex complexity rises. Using non-greedy match for columns/tables.
-    pattern = r"SELECT\s+(.+?)\s+FROM\s+(\w+)(?:\s+JOIN\s+(\w+)\s+ON\s+(.+?))?(?:\s+WHERE\s+(.+))?$"
-    match = re.search(pattern, sql, re.IGNORECASE)
+    match = _SELECT_RE.fullmatch(sql)
     if not match:
          raise ValueError("Invalid SELECT syntax")
          
-    cols_str = match.group(1).strip()
-    table_name = match.group(2)
-    join_table = match.group(3)
-    join_on = match.group(4)
-    where_clause = match.group(5)
+    cols_str = match.group('cols').strip()
+    table_name = match.group('table')
+    join_table = match.group('join_table')
+    join_on = match.group('join_on')
+    where_clause = match.group('where')
     
     if cols_str == '*':
         columns = None
@@ -164,7 +220,7 @@ def parse_select(sql: str) -> Dict[str, Any]:
     if join_table and join_on:
         # Simple parser for "colA = colB"
         # We need raw strings for columns here (no type conversion to int/bool)
-        m_on = re.match(r"(.+?)\s*=\s*(.+)", join_on)
+        m_on = _ON_RE.match(join_on)
         if not m_on:
              raise ValueError(f"Invalid ON condition: {join_on}")
         left_on = m_on.group(1).strip()
@@ -187,17 +243,19 @@ def parse_update(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: UPDATE table SET col=val, ... [WHERE condition]
     """
-    pattern = r"UPDATE\s+(\w+)\s+SET\s+(.+?)(?:\s+WHERE\s+(.+))?$"
-    match = re.search(pattern, sql, re.IGNORECASE)
+    match = _UPDATE_RE.fullmatch(sql.strip())
     if not match:
          raise ValueError("Invalid UPDATE syntax")
          
-    table_name = match.group(1)
-    set_clause = match.group(2)
-    where_clause = match.group(3)
+    table_name = match.group('table')
+    set_clause = match.group('set')
+    where_clause = match.group('where')
     
-    # Use comma delimiter for SET clause
-    matched_set = _parse_key_value_pairs(set_clause, r',')
+    # Use comma delimiter for SET clause; without quoted text a plain split is enough
+    if "'" in set_clause:
+        matched_set = _parse_key_value_pairs(set_clause, _SET_PAIR_RE)
+    else:
+        matched_set = _split_key_value_pairs(set_clause, ',')
     
     return {
         "command": "UPDATE",
@@ -210,13 +268,12 @@ def parse_delete(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: DELETE FROM table [WHERE condition]
     """
-    pattern = r"DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.+))?"
-    match = re.search(pattern, sql, re.IGNORECASE)
+    match = _DELETE_RE.fullmatch(sql.strip())
     if not match:
          raise ValueError("Invalid DELETE syntax")
          
-    table_name = match.group(1)
-    where_clause = match.group(2)
+    table_name = match.group('table')
+    where_clause = match.group('where')
     
     return {
         "command": "DELETE",
@@ -228,34 +285,53 @@ def parse_drop_table(sql: str) -> Dict[str, Any]:
     """
     Parses regex for: DROP TABLE table_name
     """
-    pattern = r"DROP\s+TABLE\s+(\w+)"
-    match = re.search(pattern, sql, re.IGNORECASE)
+    match = _DROP_RE.fullmatch(sql.strip())
     if not match:
          raise ValueError("Invalid DROP TABLE syntax")
          
     return {
         "command": "DROP_TABLE",
-        "table": match.group(1)
+        "table": match.group('table')
     }
 
+# Command keyword -> parser, checked against the first characters of the statement
+_DISPATCH = (
+    ("SELECT", parse_select),
+    ("INSERT", parse_insert),
+    ("UPDATE", parse_update),
+    ("DELETE", parse_delete),
+    ("CREATE", parse_create_table),
+    ("DROP", parse_drop_table),
+)
+
+def _copy_plan(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copies a parsed statement down to its list/dict members, so callers may
+    modify the result without touching the cached plan. (Not copy.deepcopy:
+    that is slower and would replace PLACEHOLDER with a copy.)
+    """
+    plan = {}
+    for key, value in parsed.items():
+        if type(value) is list:
+            value = list(value)
+        elif type(value) is dict:
+            value = dict(value)
+        plan[key] = value
+    return plan
+
 def parse_command(sql: str) -> Dict[str, Any]:
     """
     Route to specific parsers based on the command keyword.
+    Results are memoized per statement text; each call returns a fresh copy.
     """
-    sql = sql.strip()
-    command = sql.split()[0].upper()
-    
-    if command == "CREATE":
-        return parse_create_table(sql)
-    elif command == "INSERT":
-        return parse_insert(sql)
-    elif command == "SELECT":
-        return parse_select(sql)
-    elif command == "UPDATE":
-        return parse_update(sql)
-    elif command == "DELETE":
-        return parse_delete(sql)
-    elif command == "DROP":
-        return parse_drop_table(sql)
-    else:
-        raise ValueError(f"Unknown command: {command}")
+    return _copy_plan(_parse_cached(sql.strip()))
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(sql: str) -> Dict[str, Any]:
+    head = sql[:7].upper()
+    for prefix, parser in _DISPATCH:
+        # The keyword must be followed by whitespace (or end the statement)
+        if head.startswith(prefix) and (len(head) == len(prefix) or head[len(prefix)].isspace()):
+            return parser(sql)
+    command = sql.split()[0].upper() if sql else sql
+    raise ValueError(f"Unknown command: {command}")
@@ -3,6 +3,7 @@ storage.py - Core data storage layer for MyDB RDBMS
 
 Provides:
 - Table: Represents a database table with rows, columns, and constraints
+  (data is stored column-major: one Python list per column)
 - Database: Manages collection of tables
 
 Supports:
@@ -11,8 +12,29 @@ Supports:
 - Basic CRUD operations (INSERT, SELECT, UPDATE, DELETE)
 - Simple equality-based WHERE clauses
 """
-from typing import List, Dict, Any, Optional, Set, Tuple, Union
-from indexes import Index
+import itertools
+import sys
+from itertools import compress, repeat
+from operator import and_, eq
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from indexes import Index, SecondaryIndex
+from where_compiler import compile_rows, compile_scan, compile_where
+
+# Source of Table.version stamps. Shared by all tables so a dropped and
+# re-created table never reuses a version seen before.
+_version_counter = itertools.count(1)
+
+# A column filtered by equality on a table of at least this many rows gets a
+# secondary index (named AUTO_INDEX_PREFIX + column) built on first use
+AUTO_INDEX_MIN_ROWS = 64
+AUTO_INDEX_PREFIX = "auto_"
+
+# Functions supported by Table.aggregate
+AGGREGATES = ('SUM', 'MIN', 'MAX', 'AVG', 'COUNT')
+
+def _scatter(target: Any, row_ids: Iterable[int], value: Any):
+    """target[i] = value for every i in row_ids (the loop runs in C)."""
+    any(map(target.__setitem__, row_ids, repeat(value)))
 
 class Table:
     def __init__(self, name: str, columns: List[Tuple[str, str]], primary_key: Optional[str] = None, unique_columns: List[str] = None):
@@ -27,17 +49,44 @@ class Table:
         self.name = name
         self.columns = columns
         self.column_names = [col[0] for col in columns]
-        self.rows: List[List[Any]] = []
+        # Column-major storage: columns_data[c][i] is column c of row i, so a
+        # scan or projection only touches the columns it needs
+        self.columns_data: List[List[Any]] = [[] for _ in columns]
+        # Row slots in use, including deleted ones. Deleting only clears the
+        # row's alive flag so row numbers (and index entries) stay stable;
+        # vacuum() drops the dead slots.
+        self.n_rows = 0
+        self.alive = bytearray()
+        self.n_deleted = 0
         
         self.primary_key = primary_key
         self.unique_columns = unique_columns or []
         
         # Validation indices
         self.indexes: Dict[str, Index] = {}
+        # Named non-constraint indexes (see create_index), by index name
+        self.secondary_indexes: Dict[str, SecondaryIndex] = {}
         
         # Helper to find column index by name
         self._col_map = {name: idx for idx, name in enumerate(self.column_names)}
         
+        # TEXT columns without a PK/UNIQUE constraint tend to repeat a few values
+        # (category, status, payment method): their strings are interned so equal
+        # values share one object and compare by identity.
+        constrained = set(self.unique_columns)
+        if self.primary_key:
+            constrained.add(self.primary_key)
+        self._interned_cols = [
+            idx for idx, (col_name, col_type) in enumerate(columns)
+            if col_type.upper() == 'TEXT' and col_name not in constrained
+        ]
+        
+        # Next free integer primary key (kept in sync on insert so id allocation is O(1))
+        self._next_pk = 1
+        
+        # Changes on every modification; lets callers cache results per table state
+        self.version = next(_version_counter)
+        
         # Initialize Indexes
         if self.primary_key:
             if self.primary_key not in self.column_names:
@@ -59,9 +108,11 @@ class Table:
         """
         if len(values) != len(self.columns):
             raise ValueError(f"Column count mismatch. Expected {len(self.columns)}, got {len(values)}")
+        
+        values = self._prepare_row(values)
 
         # Next row index
-        row_idx = len(self.rows) 
+        row_idx = self.n_rows
 
         # Check Constraints & Pre-Insert into Indexes (Validation)
         # Note: Index.insert raises ValueError on violation
@@ -86,7 +137,202 @@ class Table:
             raise e
         
         # Commit insert (in-memory)
-        self.rows.append(values)
+        for index in self.secondary_indexes.values():
+            index.insert(values[self._col_map[index.column]], row_idx)
+        for column, val in zip(self.columns_data, values):
+            column.append(val)
+        self.alive.append(1)
+        self.n_rows += 1
+        self.version = next(_version_counter)
+        if self.primary_key:
+            self._track_pk(values[self._col_map[self.primary_key]])
+
+    def _prepare_row(self, values: List[Any]) -> List[Any]:
+        """Returns the row as a list with low-cardinality TEXT values interned."""
+        if type(values) is not list:
+            values = list(values)
+        for i in self._interned_cols:
+            if type(values[i]) is str:
+                values[i] = sys.intern(values[i])
+        return values
+
+    def insert_many(self, rows: List[List[Any]]) -> int:
+        """
+        Insert several rows at once. All rows are validated (column count,
+        PK/UNIQUE constraints within the batch and against existing rows)
+        before any is written; on violation nothing is inserted.
+        Returns the number of rows inserted.
+        """
+        for length in set(map(len, rows)):
+            if length != len(self.columns):
+                raise ValueError(f"Column count mismatch. Expected {len(self.columns)}, got {length}")
+        if not rows:
+            return 0
+        # Transposed straight into columns (no per-row copies); interning is
+        # then done column-wise
+        new_columns = list(zip(*rows))
+        intern = sys.intern
+        for i in self._interned_cols:
+            new_columns[i] = [intern(v) if type(v) is str else v for v in new_columns[i]]
+        
+        start = self.n_rows
+        row_ids = range(start, start + len(rows))
+        
+        loaded = []
+        try:
+            for col_name, index in self.indexes.items():
+                col_idx = self._col_map[col_name]
+                try:
+                    index.bulk_load(new_columns[col_idx], row_ids)
+                except ValueError:
+                    if col_name == self.primary_key:
+                        raise ValueError(f"Constraint Violation: Primary key already exists in table '{self.name}'")
+                    raise
+                loaded.append((col_idx, index))
+        except ValueError:
+            # Rollback: remove the batch from indexes already loaded
+            for col_idx, index in loaded:
+                for val, row_idx in zip(new_columns[col_idx], row_ids):
+                    index.delete(val, row_idx)
+            raise
+        
+        for index in self.secondary_indexes.values():
+            index.bulk_load(new_columns[self._col_map[index.column]], row_ids)
+        
+        for column, new_values in zip(self.columns_data, new_columns):
+            column.extend(new_values)
+        self.alive.extend(b'\x01' * len(rows))
+        self.n_rows += len(rows)
+        if self.primary_key:
+            self._track_pks(new_columns[self._col_map[self.primary_key]])
+        self.version = next(_version_counter)
+        return len(rows)
+
+    def create_index(self, name: str, column: str, prefix_length: Optional[int] = None):
+        """
+        Create a named secondary (non-unique) index on a column.
+        With prefix_length, rows are keyed on the first prefix_length characters
+        of the value, e.g. create_index('sale_day', 'sale_date', prefix_length=10).
+        """
+        if name in self.secondary_indexes:
+            raise ValueError(f"Index '{name}' already exists on table '{self.name}'")
+        if column not in self._col_map:
+            raise ValueError(f"Column '{column}' not found in table '{self.name}'")
+        index = SecondaryIndex(name, column, prefix_length)
+        column_values = self.columns_data[self._col_map[column]]
+        if self.n_deleted:
+            row_ids = self._live_indices()
+            index.bulk_load([column_values[i] for i in row_ids], row_ids)
+        else:
+            index.bulk_load(column_values, range(self.n_rows))
+        self.secondary_indexes[name] = index
+
+    def lookup_by(self, index_name: str, key: Any, columns: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return rows whose key in the named secondary index equals `key`.
+        Example: sales.lookup_by('sale_day', '2026-01-15')
+        """
+        if index_name not in self.secondary_indexes:
+            raise ValueError(f"Index '{index_name}' not found on table '{self.name}'")
+        target_columns = columns or self.column_names
+        target_indices = [self._col_map[col] for col in target_columns]
+        return list(self._iter_rows(sorted(self.secondary_indexes[index_name].lookup(key)),
+                                    target_columns, target_indices))
+
+    def _intern_rows(self):
+        """Intern low-cardinality TEXT values of rows loaded in bulk."""
+        intern = sys.intern
+        for i in self._interned_cols:
+            self.columns_data[i] = [intern(v) if type(v) is str else v for v in self.columns_data[i]]
+
+    @property
+    def rows(self) -> List[List[Any]]:
+        """
+        Row-major copy of the table's live rows (one list per row), built on
+        each access. Table methods work on columns_data directly.
+        """
+        return [list(row) for row in self._live_rows()]
+
+    def _live_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Iterates the live rows as tuples, in row order."""
+        return compress(zip(*self.columns_data), self.alive)
+
+    def _live_indices(self) -> List[int]:
+        """Row numbers of the live rows, in order."""
+        if not self.n_deleted:
+            return list(range(self.n_rows))
+        return list(compress(range(self.n_rows), self.alive))
+
+    def _set_columns(self, columns_data: List[List[Any]]):
+        """Replace the table's data with column lists (bulk load; indexes are not touched)."""
+        if len(columns_data) != len(self.columns):
+            raise ValueError(f"Column count mismatch. Expected {len(self.columns)}, got {len(columns_data)}")
+        self.columns_data = [list(column) for column in columns_data]
+        self.n_rows = len(self.columns_data[0]) if self.columns_data else 0
+        self.alive = bytearray(b'\x01' * self.n_rows)
+        self.n_deleted = 0
+
+    def _all_indexes(self) -> List[Tuple[int, Index]]:
+        """(column position, index) for every constraint and secondary index."""
+        pairs = [(self._col_map[col], idx) for col, idx in self.indexes.items()]
+        pairs.extend((self._col_map[idx.column], idx) for idx in self.secondary_indexes.values())
+        return pairs
+
+    def _track_pk(self, value: Any):
+        """Advance the id counter past an integer primary key value."""
+        if type(value) is int and value >= self._next_pk:
+            self._next_pk = value + 1
+
+    def _track_pks(self, values: List[Any]):
+        """Advance the id counter past every integer primary key in `values`."""
+        ints = [v for v in values if type(v) is int]
+        if ints:
+            self._track_pk(max(ints))
+
+    def _rebuild_indexes(self):
+        """
+        Rebuild every index after the columns were replaced wholesale (see
+        _set_columns), bulk-loading each one from its column in a single pass.
+        """
+        row_ids = range(self.n_rows)
+        for col_idx, idx_obj in self._all_indexes():
+            idx_obj.data.clear()
+            idx_obj.bulk_load(self.columns_data[col_idx], row_ids)
+        if self.primary_key:
+            self._track_pks(self.columns_data[self._col_map[self.primary_key]])
+
+    def checkpoint(self) -> Tuple:
+        """
+        Captures the live rows and id counter for restore() (copies every
+        column; used to undo a failed transaction).
+        """
+        if self.n_deleted:
+            columns = [list(compress(column, self.alive)) for column in self.columns_data]
+        else:
+            columns = [list(column) for column in self.columns_data]
+        return columns, self._next_pk, dict(self.secondary_indexes)
+
+    def restore(self, checkpoint: Tuple):
+        """
+        Returns the table to the state captured by checkpoint(), rebuilding its indexes.
+        """
+        columns, next_pk, secondary_indexes = checkpoint
+        self.secondary_indexes = secondary_indexes
+        self._set_columns(columns)
+        self._rebuild_indexes()
+        self._next_pk = next_pk
+        self.version = next(_version_counter)
+
+    def allocate_id(self) -> int:
+        """
+        Reserve and return the next integer primary key (max(pk) + 1).
+        Raises ValueError if the table has no primary key.
+        """
+        if not self.primary_key:
+            raise ValueError(f"Table '{self.name}' has no primary key")
+        pk = self._next_pk
+        self._next_pk += 1
+        return pk
 
     def select(self, columns: List[str] = None, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
@@ -99,6 +345,15 @@ class Table:
         
         Note: 'where' values should match the column's data type (no automatic conversion).
         """
+        return list(self.iter_select(columns, where))
+
+    def iter_select(self, columns: List[str] = None, where: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Like select, but returns an iterator that builds each row dict only
+        when it is reached. Columns and the where clause are checked (and the
+        matching rows found) immediately; the table should not be modified
+        until the iterator is exhausted.
+        """
         target_columns = columns or self.column_names
         
         # Validate target columns
@@ -107,111 +362,228 @@ class Table:
                 raise ValueError(f"Column '{col}' not found in table '{self.name}'")
 
         target_indices = [self._col_map[col] for col in target_columns]
+        return self._iter_rows(self._matching_indices(where), target_columns, target_indices)
+
+    def count(self, where: Dict[str, Any] = None) -> int:
+        """
+        Number of rows matching the where clause (all rows if None), without
+        building any row dicts.
+        """
+        if not where:
+            return self.n_rows - self.n_deleted
+        if len(where) == 1:
+            ((col, val),) = where.items()
+            if col not in self._col_map:
+                raise ValueError(f"Where column '{col}' not found")
+            index = self._equality_index(col)
+            if index is not None:
+                # Exact index: the lookup already is the answer
+                return len(index.lookup(val))
+            if self._condition_index(col) is None:
+                return sum(self._eval_where(where))
+        return len(self._matching_indices(where))
+
+    def aggregate(self, func: str, column: str, where: Dict[str, Any] = None) -> Any:
+        """
+        Computes SUM, MIN, MAX, AVG or COUNT of a column over the rows matching
+        the where clause (all rows if None), reading only that column.
+        As in SQL, None values are skipped by SUM/MIN/MAX/AVG; COUNT counts
+        the matching rows. MIN/MAX/AVG of no values is None. SUM/AVG of a
+        non-numeric value, or MIN/MAX over values that can't be compared,
+        raise ValueError.
+        Example: transactions.aggregate('SUM', 'amount', {'status': 'COMPLETED'})
+        """
+        func = func.upper()
+        if func not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{func}'")
+        if column not in self._col_map:
+            raise ValueError(f"Column '{column}' not found in table '{self.name}'")
+        if func == 'COUNT':
+            return self.count(where)
         
-        candidate_rows_indices = None
-        
-        # Optimization: Use Index if WHERE clause hits an indexed column
-        if where:
-            # Sort where keys to prioritize PK or Unique indexes if multiple exist
-            # (Heuristic: Unique indexes are most selective)
-            for col, val in where.items():
-                if col in self.indexes:
-                    index = self.indexes[col]
-                    row_indices = index.lookup(val)
-                    
-                    if candidate_rows_indices is None:
-                        candidate_rows_indices = row_indices
-                    else:
-                        candidate_rows_indices = candidate_rows_indices.intersection(row_indices)
-                    
-                    # If intersection is empty, no need to continue
-                    if not candidate_rows_indices:
-                        break
-        
-        # If no index used, scan all rows
-        if candidate_rows_indices is None:
-            scan_iterable = enumerate(self.rows)
-        else:
-            # Only scan the candidate rows from index
-            # Filter out any indices that might have been deleted (if our list compaction isn't perfect yet)
-            # In this list-based implementation with 'None' holes or re-writing, we must be careful.
-            # But wait, our current delete() implementation uses pop() which SHIFTS indices.
-            # THIS IS A PROBLEM. pop() invalidates all subsequent indices in the Index.
-            # FIX: We must change delete strategy or update ALL indexes on delete.
-            # Strategy: update list item to None (soft delete) or update all indexes. 
-            # Updating all indexes is heavy (O(N*M)). 
-            # Better strategy for Phase 4: Use Soft Delete (replace with None) or Rebuild Indexes.
-            # BUT: The requirement "Internal storage: dict mapping values to lists of row indices" implies stable indices.
-            # Let's switch to Soft Delete for simplicity in this phase, OR adhere to the `pop` and `_rebuild_indices`.
-            # Actually, `pop` is O(N) anyway.
-            # Let's stick to scanning for now unless we are sure indices are valid.
-            # Since `delete` currently does `pop`, indexes ARE invalidated. 
-            # I must update `delete` to handle index updates properly.
-            # See `_delete_row_at_index` below.
-            
-            # Assuming `delete` updates indexes correctly (by shifting or rebuilding), we use valid indices.
-            # However, shifting is O(N) potentially.
-            # Let's just assume indices are correct and use them.
-            scan_iterable = [(i, self.rows[i]) for i in candidate_rows_indices if i < len(self.rows)]
+        values = self.columns_data[self._col_map[column]]
+        if where or self.n_deleted:
+            values = list(map(values.__getitem__, self._matching_indices(where)))
+        if None in values:
+            values = [v for v in values if v is not None]
+        if func in ('SUM', 'AVG'):
+            bad = set(map(type, values)) - {int, float}
+            if bad:
+                raise ValueError(f"{func} needs numeric values; column '{column}' holds {bad.pop().__name__}")
+            if func == 'SUM':
+                return sum(values)
+        if not values:
+            return None
+        if func == 'AVG':
+            return sum(values) / len(values)
+        try:
+            return min(values) if func == 'MIN' else max(values)
+        except TypeError:
+            raise ValueError(f"{func} needs comparable values; column '{column}' mixes types")
 
-        results = []
-        for idx, row in scan_iterable:
-            # Check WHERE clause (double check even if indexed, because of potential other non-indexed conditions)
-            match = True
-            if where:
-                for w_col, w_val in where.items():
-                    if w_col not in self._col_map:
-                         raise ValueError(f"Where column '{w_col}' not found")
-                    if row[self._col_map[w_col]] != w_val:
-                        match = False
-                        break
-            
-            if match:
-                # Construct result dict
-                result_row = {}
-                for i, col_name in enumerate(target_columns):
-                    result_row[col_name] = row[target_indices[i]]
-                results.append(result_row)
-                
-        return results
+    def _iter_rows(self, row_ids: List[int], target_columns: List[str], target_indices: List[int]) -> Iterator[Dict[str, Any]]:
+        # Only the projected columns are read; rows are built by a generated
+        # dict display (see where_compiler.compile_rows)
+        build = compile_rows(target_columns, [self.columns_data[c] for c in target_indices])
+        return build(row_ids)
 
-    def _delete_row_at_index(self, index: int):
+    def _intern_value(self, col: str, val: Any) -> Any:
         """
-        Internal helper to remove row and update indices.
-        WARNING: Removing from list shifts indices of subsequent rows!
-        All indexes must be updated for all rows > index.
-        This is expensive O(N) but necessary if we use a simple list.
+        `val` interned if `col` holds interned strings, so comparisons against
+        the stored values match on identity.
         """
-        row = self.rows[index]
+        if type(val) is str and self._col_map[col] in self._interned_cols:
+            return sys.intern(val)
+        return val
+
+    def _matching_indices(self, where: Optional[Dict[str, Any]]) -> List[int]:
+        """
+        Returns the indices of rows matching the where clause, in row order.
         
-        # 1. Remove the deleted row from indexes
-        for col_name, idx_obj in self.indexes.items():
-            col_idx = self._col_map[col_name]
-            val = row[col_idx]
-            idx_obj.delete(val, index)
-            
-        # 2. Shift indices in all indexes for rows > index
-        # This is the heavy part. 
-        # For every row after 'index', we must decrement their index in the Index objects.
-        
-        # Optimization: Rebuild or Shift? Shift is cleaner.
-        # But we don't have back-pointers from row to values in Index easily.
-        # We have to scan all columns that are indexed.
-        
-        for i in range(index + 1, len(self.rows)):
-            row_to_shift = self.rows[i]
-            old_idx = i
-            new_idx = i - 1
-            
-            for col_name, idx_obj in self.indexes.items():
-                col_idx = self._col_map[col_name]
-                val = row_to_shift[col_idx]
-                
-                # We effectively "move" the entry in the index
-                idx_obj.delete(val, old_idx)
-                idx_obj.insert(val, new_idx)
+        Indexed equality conditions narrow the candidate rows first, smallest
+        index lookup first; the conditions the lookups did not already
+        settle exactly (unindexed columns, prefix indexes, lookups skipped) are
+        then checked by a filter compiled by where_compiler. Without an
+        indexed condition the
+        whole table is scanned: column-wise for a single condition (see
+        _eval_where), by a fused kernel from where_compiler for several.
+        """
+        if not where:
+            return self._live_indices()
+        
+        if len(where) == 1:
+            # Common case: a single `col = literal` condition
+            ((col, val),) = where.items()
+            index = self.indexes.get(col)
+            if index is not None:
+                # PK/UNIQUE point lookup: at most one row, no set to build
+                row_idx = index.get(val)
+                return [] if row_idx is None else [row_idx]
+            if col not in self._col_map:
+                raise ValueError(f"Where column '{col}' not found")
+            index = self._equality_index(col)
+            if index is not None:
+                return sorted(index.lookup(val))
+            return list(compress(range(self.n_rows), self._eval_where(where)))
+        
+        for col in where:
+            if col not in self._col_map:
+                raise ValueError(f"Where column '{col}' not found")
+        # Most selective first: PK/UNIQUE, then secondary-indexed, then unindexed
+        conditions = sorted(where.items(), key=lambda item: self._selectivity_rank(item[0]))
+        
+        # Optimization: Use Index if WHERE clause hits an indexed column. The
+        # posting sets are intersected smallest first, so the work is bounded
+        # by the shortest one (a PK/UNIQUE lookup holds at most one row)
+        lookups = []
+        for col, val in conditions:
+            index = self._condition_index(col)
+            if index is None:
+                break
+            lookups.append((col, index, index.lookup(index.key(val))))
+        lookups.sort(key=lambda lookup: len(lookup[2]))
+        
+        candidate_indices = None
+        # Conditions the index lookups answered exactly need no re-check
+        settled = set()
+        for col, index, res in lookups:
+            if candidate_indices is not None and len(candidate_indices) <= 1:
+                # Checking one row is cheaper than another intersection
+                break
+            if self._is_exact(index):
+                settled.add(col)
+            if candidate_indices is None:
+                candidate_indices = res
+            else:
+                candidate_indices = candidate_indices.intersection(res)
+            # If intersection is empty, no need to continue
+            if not candidate_indices:
+                return []
+        
+        if candidate_indices is None:
+            # Fused full scan: one pass over the clause's columns
+            scan_where = {col: self._intern_value(col, val) for col, val in conditions}
+            return compile_scan(scan_where, self._col_map, self.columns_data,
+                                self.alive if self.n_deleted else None)()
+        unchecked = {col: self._intern_value(col, val) for col, val in conditions if col not in settled}
+        if not unchecked:
+            return sorted(candidate_indices)
+        # Only check the candidate rows from index; `and` short-circuits in
+        # selectivity order
+        return compile_where(unchecked, self._col_map, self.columns_data)(sorted(candidate_indices))
+
+    def _condition_index(self, col: str) -> Optional[Index]:
+        """
+        The index narrowing an equality on `col`: its PK/UNIQUE index, else a
+        secondary index on the column (whole-value before prefix), else None.
+        """
+        index = self.indexes.get(col)
+        if index is not None:
+            return index
+        found = None
+        for index in self.secondary_indexes.values():
+            if index.column == col:
+                if index.prefix_length is None:
+                    return index
+                found = index
+        return found
+
+    def _equality_index(self, col: str) -> Optional[Index]:
+        """
+        An exact index on `col` for equality lookups, or None. An unindexed
+        column of a table with at least AUTO_INDEX_MIN_ROWS rows is indexed
+        here. The index is then maintained like any other but never saved: a
+        loaded table rebuilds it on its next equality lookup.
+        """
+        index = self._condition_index(col)
+        if index is None and self.n_rows - self.n_deleted >= AUTO_INDEX_MIN_ROWS:
+            name = AUTO_INDEX_PREFIX + col
+            if name not in self.secondary_indexes:
+                self.create_index(name, col)
+                return self.secondary_indexes[name]
+        return index if index is not None and self._is_exact(index) else None
 
-        self.rows.pop(index)
+    @staticmethod
+    def _is_exact(index: Index) -> bool:
+        """True if a lookup returns exactly the rows equal to the value (no prefix keying)."""
+        return not isinstance(index, SecondaryIndex) or index.prefix_length is None
+
+    def _selectivity_rank(self, col: str) -> int:
+        """Sort key for WHERE conditions: 0 unique index, 1 secondary index, 2 unindexed."""
+        if col in self.indexes:
+            return 0
+        return 1 if self._condition_index(col) is not None else 2
+
+    def _eval_where(self, where: Dict[str, Any]) -> Iterator[bool]:
+        """
+        Evaluates the where clause over whole columns, yielding one truth value
+        per row slot (false for deleted rows).
+        
+        Each equality is a map(operator.eq) over its column and the per-column
+        results are combined with map(operator.and_), so the scan runs in C
+        without a Python-level call per row.
+        """
+        mask = None
+        for col, val in where.items():
+            if col not in self._col_map:
+                raise ValueError(f"Where column '{col}' not found")
+            column_mask = map(eq, self.columns_data[self._col_map[col]], repeat(self._intern_value(col, val)))
+            mask = column_mask if mask is None else map(and_, mask, column_mask)
+        if self.n_deleted:
+            mask = map(and_, mask, self.alive)
+        return mask
+
+    def vacuum(self) -> int:
+        """
+        Drop deleted rows from storage, renumbering the live rows and
+        rebuilding each index once. Returns the number of slots reclaimed.
+        """
+        reclaimed = self.n_deleted
+        if not reclaimed:
+            return 0
+        self._set_columns([list(compress(column, self.alive)) for column in self.columns_data])
+        self._rebuild_indexes()
+        return reclaimed
 
     def delete(self, where: Dict[str, Any]) -> int:
         """
@@ -222,45 +594,22 @@ class Table:
         # Use select logic (optimization) to find indices if possible
         # But we can't reuse select() directly because we need indices.
         
-        rows_to_delete = []
+        rows_to_delete = self._matching_indices(where)
+        if not rows_to_delete:
+            return 0
         
-        # Optimization: Use Index if available
-        candidate_indices = None
-        if where:
-             for col, val in where.items():
-                if col in self.indexes:
-                    idx_obj = self.indexes[col]
-                    res = idx_obj.lookup(val)
-                    if candidate_indices is None:
-                        candidate_indices = res
-                    else:
-                        candidate_indices = candidate_indices.intersection(res)
-                    if not candidate_indices:
-                        break
+        # Rows are only marked dead (tombstones): later rows keep their
+        # indices, so only the deleted rows' own index entries change
+        for col_idx, idx_obj in self._all_indexes():
+            idx_obj.bulk_delete(map(self.columns_data[col_idx].__getitem__, rows_to_delete), rows_to_delete)
+        _scatter(self.alive, rows_to_delete, 0)
+        self.n_deleted += len(rows_to_delete)
+        self.version = next(_version_counter)
         
-        if candidate_indices is None:
-            scan_iterable = enumerate(self.rows)
-        else:
-            scan_iterable = [(i, self.rows[i]) for i in candidate_indices if i < len(self.rows)]
-            
-        for idx, row in scan_iterable:
-            match = True
-            if where:
-                for w_col, w_val in where.items():
-                    if row[self._col_map[w_col]] != w_val:
-                        match = False
-                        break
-            if match:
-                rows_to_delete.append(idx)
-        
-        # Delete in reverse order to avoid shifting issues during the loop
-        # (Though _delete_row_at_index handles shifting, deleting reverse is safer/efficient)
-        count = 0
-        for idx in sorted(rows_to_delete, reverse=True):
-            self._delete_row_at_index(idx)
-            count += 1
-            
-        return count
+        # Compact once dead slots outnumber live rows
+        if self.n_deleted * 2 > self.n_rows:
+            self.vacuum()
+        return len(rows_to_delete)
 
     def update(self, set_values: Dict[str, Any], where: Dict[str, Any]) -> int:
         """
@@ -269,106 +618,50 @@ class Table:
         Returns number of updated rows.
         """
         # Find rows to update (similar logic as delete)
-        rows_to_update = []
+        rows_to_update = self._matching_indices(where)
         
-        candidate_indices = None
-        if where:
-             for col, val in where.items():
-                if col in self.indexes:
-                    idx_obj = self.indexes[col]
-                    res = idx_obj.lookup(val)
-                    if candidate_indices is None:
-                        candidate_indices = res
-                    else:
-                        candidate_indices = candidate_indices.intersection(res)
-                    if not candidate_indices:
-                        break
+        new_values = {}
+        for col, val in set_values.items():
+            if col not in self._col_map:
+                raise ValueError(f"Column '{col}' not found")
+            new_values[col] = self._intern_value(col, val)
         
-        if candidate_indices is None:
-            scan_iterable = enumerate(self.rows)
-        else:
-            scan_iterable = [(i, self.rows[i]) for i in candidate_indices if i < len(self.rows)]
-
-        for idx, row in scan_iterable:
-            match = True
-            if where:
-                for w_col, w_val in where.items():
-                    if row[self._col_map[w_col]] != w_val:
-                        match = False
-                        break
-            if match:
-                rows_to_update.append(idx)
-        
-        count = 0 
-        for idx in rows_to_update:
-            row = self.rows[idx]
-            original_row = list(row)
-            new_row = list(row)
-            
-            # 1. updates the data in temporary new_row
-            # 2. checks constraints against indexes (tricky: must exclude current row from check?)
-            #    The Index class checks `if value in data`.
-            #    If we update a Unique column to the SAME value, it's fine.
-            #    If we update to a DIFFERENT value, we check if that value exists.
-            
-            # Let's perform updates on indexes transactionally
-            
-            updates_to_apply = [] # List of (col_name, old_val, new_val)
-            
-            try:
-                # Validation Phase
-                for col, val in set_values.items():
-                    if col not in self._col_map:
-                         raise ValueError(f"Column '{col}' not found")
-                    
-                    col_idx = self._col_map[col]
-                    old_val = row[col_idx]
-                    
-                    if old_val == val:
-                        continue # No change
-                        
-                    if col in self.indexes:
-                        idx_obj = self.indexes[col]
-                        # Check unique constraint proactively if needed
-                        # index.update() handles "if unique and exists -> error"
-                        # But we must call it to check.
-                        # We can't actually call index.update() yet because we might rollback.
-                        # We just check `lookup`.
-                        if idx_obj.unique:
-                             if idx_obj.lookup(val):
-                                 # Exists. But might be THIS row? (Only if we didn't filter old_val==val above)
-                                 # Since old_val != val, the existing entry is definitely another row.
-                                 raise ValueError(f"Constraint Violation: Unique constraint violated on column '{col}'")
-                    
-                    updates_to_apply.append((col, old_val, val))
-                    new_row[col_idx] = val
-
-                # Application Phase
-                # Update indexes first
-                applied_idx_updates = []
-                try:
-                    for col, old_val, new_val in updates_to_apply:
-                        if col in self.indexes:
-                            self.indexes[col].update(old_val, new_val, idx)
-                            applied_idx_updates.append((col, old_val, new_val))
-                except ValueError as e:
-                    # Rollback index updates
-                    for col, old_val, new_val in reversed(applied_idx_updates):
-                        self.indexes[col].update(new_val, old_val, idx)
-                    raise e
-                    
-                # Update row data
-                self.rows[idx] = new_row
-                count += 1
-                
-            except ValueError as e:
-                # This row creation failed. Since we handle per-row, we just stop? 
-                # Or continue? Usually SQL updates are transactional (all or nothing) or per-row.
-                # For Phase 4, raising error and stopping (partial update) is improved but transactional is better.
-                # Let's just raise and stop.
-                raise e
-            
-        return count
+        # Validation Phase: every row is checked before anything is written,
+        # so a constraint violation leaves the table untouched. Only the SET
+        # columns are read: changed[col] = (rows whose value differs, their
+        # old values)
+        changed: Dict[str, Tuple[List[int], List[Any]]] = {}
+        for col, val in new_values.items():
+            column = self.columns_data[self._col_map[col]]
+            ids = [idx for idx in rows_to_update if column[idx] != val]
+            changed[col] = (ids, [column[idx] for idx in ids])
+        
+        # Unique columns, checked once per column: every changed row gets the
+        # same value, so more than one is a violation; with one, an existing
+        # entry for val is definitely another row (its old value differs)
+        for col, (ids, old_values) in changed.items():
+            if ids and col in self.indexes:
+                if len(ids) > 1 or self.indexes[col].get(new_values[col]) is not None:
+                    raise ValueError(f"Constraint Violation: Unique constraint violated on column '{col}'")
+        
+        # Application Phase: one scatter per column, indexes updated in bulk
+        for col, (ids, old_values) in changed.items():
+            if not ids:
+                continue
+            val = new_values[col]
+            col_idx = self._col_map[col]
+            for index_col, idx_obj in self._all_indexes():
+                if index_col == col_idx:
+                    idx_obj.bulk_delete(old_values, ids)
+                    idx_obj.bulk_load([val] * len(ids), ids)
+            _scatter(self.columns_data[col_idx], ids, val)
+            if col == self.primary_key:
+                # allocate_id must not hand out the new key again
+                self._track_pk(val)
+        
+        if rows_to_update:
+            self.version = next(_version_counter)
+        return len(rows_to_update)
 
     def inner_join(self, other: 'Table', left_col: str, right_col: str, select_columns: List[str] = None, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
@@ -385,90 +678,97 @@ class Table:
         left_idx = self._col_map[left_col]
         right_idx = other._col_map[right_col]
         
-        # Check if right table has index on right_col
-        right_index = other.indexes.get(right_col)
+        # Probe: join value -> right row numbers. Uses an exact index on
+        # right_col (built for large tables, see _equality_index), else a
+        # temp dict for O(N+M)
+        right_index = other._equality_index(right_col)
+        if right_index is not None:
+            if right_index.unique:
+                matches = right_index.lookup
+            else:
+                # Right rows in table order, as with the temp dict
+                matches = lambda val: sorted(right_index.lookup(val))
+        else:
+            probe: Dict[Any, List[int]] = {}
+            right_values = other.columns_data[right_idx]
+            for r_i in other._live_indices():
+                probe.setdefault(right_values[r_i], []).append(r_i)
+            matches = lambda val: probe.get(val, ())
         
-        # If no index, build a temp dict for O(N+M)
-        if not right_index:
-            temp_index = {}
-            for r_i, r_row in enumerate(other.rows):
-                val = r_row[right_idx]
-                if val not in temp_index:
-                    temp_index[val] = []
-                temp_index[val].append(r_row)
+        # Build phase: (left row, right row) number pairs, no row copies
+        left_ids: List[int] = []
+        right_ids: List[int] = []
+        left_values = self.columns_data[left_idx]
+        for l_i in self._live_indices():
+            for r_i in matches(left_values[l_i]):
+                left_ids.append(l_i)
+                right_ids.append(r_i)
         
-        for l_row in self.rows:
-            l_val = l_row[left_idx]
-            
-            # Find matching rows in right table
-            matching_rows = []
-            if right_index:
-                # index.lookup returns row INDICES
-                r_indices = right_index.lookup(l_val)
-                matching_rows = [other.rows[i] for i in r_indices]
-            else:
-                matching_rows = temp_index.get(l_val, [])
+        # Result keys and WHERE/column routing depend only on the schemas,
+        # so they are resolved once rather than per joined row
+        left_keys = [f"{self.name}.{col}" for col in self.column_names]
+        right_keys = [f"{other.name}.{col}" for col in other.column_names]
+        joined_keys = left_keys + right_keys
+        
+        def resolve(name: str) -> Optional[str]:
+            # 'table.col' matches exactly, a bare 'col' by suffix
+            if name in joined_keys:
+                return name
+            for key in joined_keys:
+                if key.endswith(f".{name}"):
+                    return key
+            return None
+        
+        # Joined key -> (side, column) it is read from, side 0 being the left
+        # row numbers; with equal table names the right side wins, as in the
+        # joined row
+        routes = {key: (0, self.columns_data[i]) for i, key in enumerate(left_keys)}
+        routes.update({key: (1, other.columns_data[i]) for i, key in enumerate(right_keys)})
+        
+        # Apply WHERE filter to the pairs, one condition (column) at a time;
+        # conditions on columns missing from both tables are ignored
+        pairs = [left_ids, right_ids]
+        for w_key, w_val in (where or {}).items():
+            if not pairs[0]:
+                break
+            key = resolve(w_key)
+            if key is None:
+                continue
+            side, column = routes[key]
+            mask = list(map(eq, map(column.__getitem__, pairs[side]), repeat(w_val)))
+            pairs = [list(compress(ids, mask)) for ids in pairs]
+        left_ids, right_ids = pairs
+        
+        # Rows are only materialized for matching pairs
+        l_columns = self.columns_data
+        r_columns = other.columns_data
+        for l_i, r_i in zip(left_ids, right_ids):
+            joined_row = dict(zip(left_keys, [column[l_i] for column in l_columns]))
+            joined_row.update(zip(right_keys, [column[r_i] for column in r_columns]))
+            results.append(joined_row)
+
+        # Filter Select Cols ('*' alone keeps the whole joined row)
+        if select_columns and select_columns != ['*']:
+            # (output name, joined key); None puts every joined column ('*')
+            # at that position
+            targets = []
+            for req_col in select_columns:
+                if req_col == '*':
+                    targets.append((None, None))
+                    continue
+                # req_col might be 'name' or 'users.name'
+                key = resolve(req_col)
+                if key is not None:
+                    targets.append((req_col, key))
             
-            for r_row in matching_rows:
-                joined_row = {}
-                
-                # Add left columns
-                for i, col in enumerate(self.column_names):
-                    key = f"{self.name}.{col}"
-                    joined_row[key] = l_row[i]
-                    
-                # Add right columns
-                for i, col in enumerate(other.column_names):
-                    key = f"{other.name}.{col}"
-                    joined_row[key] = r_row[i]
-                
-                # Apply WHERE filter
-                match = True
-                if where:
-                    for w_key, w_val in where.items():
-                        found = False
-                        # Check strict match 'table.col'
-                        if w_key in joined_row:
-                            if joined_row[w_key] == w_val:
-                                found = True
-                            else:
-                                match = False # Mismatch
-                                break
-                        
-                        # Check suffix match 'col'
-                        if not found and match:
-                            for jr_key in joined_row:
-                                if jr_key.endswith(f".{w_key}"):
-                                    if joined_row[jr_key] != w_val:
-                                        match = False
-                                    found = True
-                                    break
-                        
-                        # If key not found in row at all? (Ignore or Fail?)
-                        # For now ignoring if column is missing (weak), usually should fail.
-                        pass
-                    
-                if match:
-                    results.append(joined_row)
-
-        # Filter Select Cols
-        if select_columns:
             final_results = []
             for res in results:
                 filtered = {}
-                for req_col in select_columns:
-                    if req_col == '*':
-                         filtered.update(res) # TODO: Handle * properly? Usually * selects all.
-                         continue
-                         
-                    # req_col might be 'name' or 'users.name'
-                    if req_col in res:
-                        filtered[req_col] = res[req_col]
+                for req_col, key in targets:
+                    if key is None:
+                        filtered.update(res)
                     else:
-                        for k, v in res.items():
-                            if k.endswith(f".{req_col}"):
-                                filtered[req_col] = v
-                                break
+                        filtered[req_col] = res[key]
                 final_results.append(filtered)
             return final_results
             
@@ -476,16 +776,28 @@ class Table:
 
 
 import json
+import os
+import warnings
+from wal import WriteAheadLog, WAL_SUFFIX, file_lock, file_state
 
 class Database:
     def __init__(self):
         self.tables: Dict[str, Table] = {}
+        # (filename, wal.file_state) of the file this state was last loaded
+        # from or written to; see is_stale
+        self.synced_file: Optional[Tuple[str, Tuple]] = None
 
     def create_table(self, name: str, columns: List[Tuple[str, str]], primary_key: Optional[str] = None, unique_columns: List[str] = None):
         if name in self.tables:
             raise ValueError(f"Table '{name}' already exists")
         self.tables[name] = Table(name, columns, primary_key, unique_columns)
 
+    def reset(self):
+        """
+        Drops all tables in place (e.g. before loading another file into this instance).
+        """
+        self.tables.clear()
+
     def get_table(self, name: str) -> Table:
         if name not in self.tables:
             raise ValueError(f"Table '{name}' not found")
@@ -499,6 +811,8 @@ class Database:
     def save_to_file(self, filename: str):
         """
         Save the database to a file (JSON format, .josedb extension recommended).
+        Rows are stored column-major ("column_data": one list per column), so
+        each value is written once without per-row list framing.
         """
         data = {
             "tables": {}
@@ -508,19 +822,59 @@ class Database:
                 "columns": table.columns,
                 "primary_key": table.primary_key,
                 "unique_columns": table.unique_columns,
-                "rows": table.rows
+                "secondary_indexes": {
+                    idx_name: {"column": idx.column, "prefix_length": idx.prefix_length}
+                    for idx_name, idx in table.secondary_indexes.items()
+                    if not idx_name.startswith(AUTO_INDEX_PREFIX)
+                },
+                "column_data": table.columns_data if not table.n_deleted
+                               else [list(compress(column, table.alive)) for column in table.columns_data]
             }
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+        # Encoded in one shot: json.dumps uses the C encoder, json.dump
+        # (streaming to a file) falls back to the pure-Python one
+        payload = json.dumps(data, separators=(',', ':'))
+        
+        # Write to a temp file and rename, so readers never see a partial snapshot
+        with file_lock(filename):
+            tmp_filename = filename + ".tmp"
+            with open(tmp_filename, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_filename, filename)
+            
+            # The snapshot now contains everything that was logged
+            WriteAheadLog(filename + WAL_SUFFIX).truncate()
+            self.mark_synced(filename)
+
+    def mark_synced(self, filename: str):
+        """
+        Records that the in-memory state matches `filename` as it is on disk now.
+        Call while holding the file lock.
+        """
+        self.synced_file = (filename, file_state(filename))
+
+    def is_stale(self, filename: str) -> bool:
+        """
+        True if `filename` was loaded or written by this instance and has been
+        changed on disk since (by another process). Call while holding the file lock.
+        """
+        return (self.synced_file is not None and self.synced_file[0] == filename
+                and self.synced_file[1] != file_state(filename))
 
     def load_from_file(self, filename: str):
         """
         Load the database from a file.
-        This rebuilds the in-memory state including all indexes.
+        This rebuilds the in-memory state including all indexes,
+        then replays any statements logged in the write-ahead log since.
+        A logged statement that no longer applies (e.g. two processes
+        inserted the same primary key) is skipped with a warning naming it,
+        so the file always loads.
         """
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        with file_lock(filename, exclusive=False):
+            with open(filename, 'r') as f:
+                data = json.load(f)
+            log_entries = WriteAheadLog(filename + WAL_SUFFIX).read()
+            self.mark_synced(filename)
             
         self.tables = {}
         for name, table_data in data["tables"].items():
@@ -532,25 +886,50 @@ class Database:
                 table_data["unique_columns"]
             )
             
-            # Load rows
-            table.rows = table_data["rows"]
+            # Load rows (column-major snapshot, or row-major files from older versions)
+            if "column_data" in table_data:
+                table._set_columns(table_data["column_data"])
+            elif table_data["rows"]:
+                table._set_columns([list(col) for col in zip(*table_data["rows"])])
+            
+            table._intern_rows()
             
             # Rebuild Indexes!
-            # We iterate through all loaded rows and insert them into the Index objects manually.
-            # This is necessary because setting `table.rows` directly bypasses `insert_row` logic.
+            # Setting the columns directly bypasses `insert_row` logic, so each
+            # index is bulk-loaded from its column in a single pass.
+            table._rebuild_indexes()
             
-            for row_idx, row in enumerate(table.rows):
-                # Update PK Index
-                if table.primary_key:
-                    pk_idx = table._col_map[table.primary_key]
-                    val = row[pk_idx]
-                    table.indexes[table.primary_key].insert(val, row_idx)
-                
-                # Update Unique Indexes
-                for col in table.unique_columns:
-                    col_idx = table._col_map[col]
-                    val = row[col_idx]
-                    table.indexes[col].insert(val, row_idx)
+            for idx_name, idx_def in table_data.get("secondary_indexes", {}).items():
+                table.create_index(idx_name, idx_def["column"], idx_def["prefix_length"])
 
             self.tables[name] = table
+        
+        for number, entry in enumerate(log_entries, 1):
+            try:
+                self.apply_log_entry(entry)
+            except (ValueError, KeyError) as e:
+                warnings.warn(f"{filename}{WAL_SUFFIX}: skipped log entry {number} "
+                              f"({entry.get('command')} on '{entry.get('table')}'): {e}")
 
+    def apply_log_entry(self, entry: Dict[str, Any]):
+        """
+        Re-applies one logged modification (a parsed, parameter-bound statement).
+        """
+        command = entry['command']
+        if command == 'CREATE_TABLE':
+            self.create_table(entry['table'], [tuple(c) for c in entry['columns']],
+                              entry['primary_key'], entry['unique_columns'])
+        elif command == 'INSERT':
+            self.get_table(entry['table']).insert_row(list(entry['values']))
+        elif command == 'INSERT_MANY':
+            self.get_table(entry['table']).insert_many(entry['rows'])
+        elif command == 'UPDATE':
+            self.get_table(entry['table']).update(entry['set'], entry['where'])
+        elif command == 'DELETE':
+            self.get_table(entry['table']).delete(entry['where'])
+        elif command == 'DROP_TABLE':
+            self.drop_table(entry['table'])
+        elif command == 'CREATE_INDEX':
+            self.get_table(entry['table']).create_index(entry['name'], entry['column'], entry['prefix_length'])
+        else:
+            raise ValueError(f"Unknown log entry: {command}")
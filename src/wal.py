@@ -0,0 +1,140 @@
+"""
+wal.py - Append-only write-ahead log for MyDB RDBMS
+
+Instead of rewriting the whole database file after every modification, the
+executor appends each modifying statement (its bound, parsed form) to
+`<db_file>.wal` as one JSON line. The log is folded back into the snapshot
+(compaction) once it grows larger than the snapshot itself.
+
+On load, Database.load_from_file reads the snapshot and then replays the log.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single process assumed
+    fcntl = None
+
+WAL_SUFFIX = ".wal"
+LOCK_SUFFIX = ".lock"
+
+# Lock files held by the current thread (flock is per open file, so
+# threads of one process exclude each other like separate processes)
+_held = threading.local()
+
+def _held_locks() -> Set[str]:
+    if not hasattr(_held, 'paths'):
+        _held.paths = set()
+    return _held.paths
+
+@contextmanager
+def file_lock(db_file: str, exclusive: bool = True):
+    """
+    Advisory inter-process lock for a database file (held on `<db_file>.lock`).
+    Writers (snapshot rewrite, log append) take it exclusive; loaders take it
+    shared, so another process never reads a half-applied compaction.
+    The lock only keeps reads and writes of the file whole: each process
+    still works on its own in-memory copy, which Executor.flush reloads
+    when another process has written since (see Database.is_stale).
+    Re-entrant within a thread: nested acquisitions reuse the outer lock,
+    while other threads block on it like other processes.
+    """
+    path = db_file + LOCK_SUFFIX
+    held = _held_locks()
+    if fcntl is None or path in held:
+        yield
+        return
+
+    with open(path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            # closing the file releases the flock
+
+def file_state(db_file: str) -> Optional[Tuple]:
+    """
+    Identifies the on-disk version of a database file and its log (None if
+    the file does not exist). Any snapshot rewrite or log append by another
+    process changes it.
+    """
+    try:
+        snapshot = os.stat(db_file)
+    except OSError:
+        return None
+    try:
+        log = os.stat(db_file + WAL_SUFFIX)
+        log_state = (log.st_size, log.st_mtime_ns)
+    except OSError:
+        log_state = None
+    return (snapshot.st_ino, snapshot.st_size, snapshot.st_mtime_ns, log_state)
+
+class WriteAheadLog:
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, entries: List[Dict[str, Any]]):
+        """
+        Append entries to the log in a single write.
+        """
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, separators=(',', ':')) + "\n" for entry in entries)
+        self._drop_torn_tail()
+        with open(self.path, 'a') as f:
+            f.write(data)
+
+    def _drop_torn_tail(self):
+        """
+        Cuts a torn final line (see read) off the log, so the next entry is
+        not glued onto it.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if not size:
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Returns all logged entries in order. A torn final line (from a crash
+        mid-write) is ignored.
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                entries.append(json.loads(line))
+        return entries
+
+    def size(self) -> int:
+        """
+        Current size of the log in bytes (0 if it does not exist).
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def truncate(self):
+        """
+        Discard the log (after its entries are captured in a snapshot).
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
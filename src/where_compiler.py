@@ -0,0 +1,124 @@
+"""
+where_compiler.py - Compiles WHERE clauses (and row projections) into Python code for MyDB RDBMS
+
+A WHERE clause such as {'id': 5, 'category': 'Tea'} is turned into a Python
+function filtering row numbers, equivalent to:
+
+    lambda row_ids: [i for i in row_ids if id_column[i] == 5 and category_column[i] == 'Tea']
+
+so candidate rows are checked by one straight-line expression inlined in a
+comprehension, with no predicate call per row and no walk over the where dict.
+
+The generated code only depends on the column positions (the "shape" of the
+clause), never on the values: columns and values are bound as closure
+variables. Each shape is compiled once and reused for every later query
+with the same shape.
+
+compile_scan fuses a whole table scan into one generated comprehension:
+
+    [i for i, a, b in zip(count(), id_column, category_column) if a == 5 and b == 'Tea']
+
+walking all the clause's columns together in a single pass, with no call
+per row and later columns compared only when the earlier ones matched.
+
+compile_rows does the same for building result rows: a projection onto
+(id, name) becomes
+
+    ({_k0: _c0[i], _k1: _c1[i]} for i in row_ids)
+
+a dict display per row instead of a loop over the projected columns.
+"""
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Column positions -> factory building a row filter from the columns and WHERE values
+_FACTORY_CACHE: Dict[Tuple[int, ...], Callable[..., Callable[[Iterable[int]], List[int]]]] = {}
+
+def _build_factory(col_indices: Tuple[int, ...]) -> Callable[..., Callable[[Iterable[int]], List[int]]]:
+    n = len(col_indices)
+    args = ", ".join([f"_c{i}" for i in range(n)] + [f"_v{i}" for i in range(n)])
+    test = " and ".join(f"_c{i}[i] == _v{i}" for i in range(n)) or "True"
+    source = f"def _make({args}):\n    return lambda row_ids: [i for i in row_ids if {test}]\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<where {col_indices}>", "exec"), namespace)
+    return namespace["_make"]
+
+# (column positions, checks alive flags) -> factory building a scan kernel
+_SCAN_CACHE: Dict[Tuple[Tuple[int, ...], bool], Callable[..., Callable[[], List[int]]]] = {}
+
+def _build_scan_factory(col_indices: Tuple[int, ...], with_alive: bool) -> Callable[..., Callable[[], List[int]]]:
+    n = len(col_indices)
+    columns = [f"_c{i}" for i in range(n)]
+    items = [f"_x{i}" for i in range(n)]
+    tests = [f"_x{i} == _v{i}" for i in range(n)]
+    if with_alive:
+        columns.insert(0, "_alive")
+        items.insert(0, "_a")
+        tests.insert(0, "_a")
+    args = ", ".join(columns + [f"_v{i}" for i in range(n)])
+    source = (f"def _make({args}):\n"
+              f"    return lambda: [i for i, {', '.join(items)} in zip(_count(), {', '.join(columns)}) "
+              f"if {' and '.join(tests) or 'True'}]\n")
+    namespace: Dict[str, Any] = {"_count": count}
+    exec(compile(source, f"<scan {col_indices}>", "exec"), namespace)
+    return namespace["_make"]
+
+def _col_indices(where: Dict[str, Any], col_map: Dict[str, int]) -> Tuple[int, ...]:
+    try:
+        return tuple(col_map[col] for col in where)
+    except KeyError as e:
+        raise ValueError(f"Where column '{e.args[0]}' not found")
+
+def compile_where(where: Dict[str, Any], col_map: Dict[str, int], columns_data: List[List[Any]]) -> Callable[[Iterable[int]], List[int]]:
+    """
+    Returns a filter taking row numbers and returning (in order) those for
+    which every {column: value} equality in `where` holds in columns_data.
+    Raises ValueError for unknown columns.
+    """
+    col_indices = _col_indices(where, col_map)
+    factory = _FACTORY_CACHE.get(col_indices)
+    if factory is None:
+        factory = _build_factory(col_indices)
+        _FACTORY_CACHE[col_indices] = factory
+    return factory(*[columns_data[c] for c in col_indices], *where.values())
+
+def compile_scan(where: Dict[str, Any], col_map: Dict[str, int], columns_data: List[List[Any]],
+                 alive: Optional[bytearray] = None) -> Callable[[], List[int]]:
+    """
+    Returns a function scanning columns_data in one pass and returning the
+    numbers of the rows where every {column: value} equality in `where` holds
+    (skipping rows whose `alive` flag is 0, if given).
+    Raises ValueError for unknown columns.
+    """
+    col_indices = _col_indices(where, col_map)
+    key = (col_indices, alive is not None)
+    factory = _SCAN_CACHE.get(key)
+    if factory is None:
+        factory = _build_scan_factory(*key)
+        _SCAN_CACHE[key] = factory
+    columns = [columns_data[c] for c in col_indices]
+    if alive is not None:
+        columns.insert(0, alive)
+    return factory(*columns, *where.values())
+
+# Number of projected columns -> factory building a row builder
+_ROWS_CACHE: Dict[int, Callable[..., Callable[[Iterable[int]], Iterator[Dict[str, Any]]]]] = {}
+
+def _build_rows_factory(n: int) -> Callable[..., Callable[[Iterable[int]], Iterator[Dict[str, Any]]]]:
+    args = ", ".join([f"_k{i}" for i in range(n)] + [f"_c{i}" for i in range(n)])
+    display = ", ".join(f"_k{i}: _c{i}[i]" for i in range(n))
+    source = f"def _make({args}):\n    return lambda row_ids: ({{{display}}} for i in row_ids)\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<rows {n}>", "exec"), namespace)
+    return namespace["_make"]
+
+def compile_rows(names: List[str], columns: List[List[Any]]) -> Callable[[Iterable[int]], Iterator[Dict[str, Any]]]:
+    """
+    Returns a function taking row numbers and lazily yielding one dict per row,
+    mapping names[k] to that row's value in columns[k].
+    """
+    factory = _ROWS_CACHE.get(len(names))
+    if factory is None:
+        factory = _build_rows_factory(len(names))
+        _ROWS_CACHE[len(names)] = factory
+    return factory(*names, *columns)
@@ -5,7 +5,7 @@ import os
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from executor import Executor
+from executor import Executor, ExecutorError
 from storage import Database
 
 class TestExecutor(unittest.TestCase):
@@ -55,9 +55,90 @@ class TestExecutor(unittest.TestCase):
         rows = self.executor.execute("SELECT * FROM users")
         self.assertEqual(len(rows), 0)
 
+    def test_params(self):
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.executor.execute("INSERT INTO users VALUES (?, ?)", (1, "O'Brien"))
+        self.executor.execute("INSERT INTO users VALUES (?, ?)", (2, "Bob"))
+        
+        rows = self.executor.execute("SELECT name FROM users WHERE id = ?", (1,))
+        self.assertEqual(rows[0]['name'], "O'Brien")
+        
+        result = self.executor.execute("UPDATE users SET name = ? WHERE id = ?", ("Robert", 2))
+        self.assertEqual(result, "1 rows updated.")
+        rows = self.executor.execute("SELECT name FROM users WHERE id = ?", (2,))
+        self.assertEqual(rows[0]['name'], "Robert")
+        
+        with self.assertRaises(ExecutorError):
+            self.executor.execute("SELECT * FROM users WHERE id = ?")
+
+    def test_execute_many(self):
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        result = self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(1, 'Alice'), (2, 'Bob')])
+        self.assertEqual(result, "2 rows inserted.")
+        
+        # A duplicate anywhere in the batch inserts nothing
+        with self.assertRaises(ExecutorError):
+            self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(3, 'Carol'), (1, 'Dup')])
+        self.assertEqual(len(self.executor.execute("SELECT * FROM users")), 2)
+        
+        self.executor.execute_many("UPDATE users SET name = ? WHERE id = ?", [('Alicia', 1), ('Robert', 2)])
+        rows = self.executor.execute("SELECT name FROM users WHERE id = 2")
+        self.assertEqual(rows[0]['name'], 'Robert')
+
+    def test_row_iter(self):
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(1, 'Alice'), (2, 'Bob')])
+        rows = self.executor.row_iter("SELECT name FROM users")
+        self.assertEqual(next(rows), {'name': 'Alice'})
+        self.assertEqual(list(rows), [{'name': 'Bob'}])
+        with self.assertRaises(ExecutorError):
+            self.executor.row_iter("SELECT missing FROM users")
+
+    def test_count(self):
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(1, 'Alice'), (2, 'Bob'), (3, 'Bob')])
+        self.assertEqual(self.executor.execute("SELECT COUNT(*) FROM users"), [{'COUNT(*)': 3}])
+        self.assertEqual(self.executor.execute("SELECT count(*) FROM users WHERE name = ?", ('Bob',)),
+                         [{'count(*)': 2}])
+        self.assertEqual(self.executor.row_iter("SELECT COUNT(*) FROM users WHERE id = 9"), [{'COUNT(*)': 0}])
+
+    def test_result_cache(self):
+        executor = Executor(self.db, result_cache_size=8)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        
+        first = executor.execute("SELECT * FROM users")
+        self.assertIs(executor.execute("SELECT * FROM users"), first)
+        with self.assertRaises(TypeError):
+            first[0]['name'] = 'Mallory'
+        
+        executor.execute("INSERT INTO users VALUES (2, 'Bob')")
+        self.assertEqual(len(executor.execute("SELECT * FROM users")), 2)
+
+    def test_warmup(self):
+        executor = Executor(self.db, result_cache_size=8)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.warmup(["SELECT * FROM users", "SELECT * FROM missing"])
+        self.assertIn("SELECT * FROM users", executor._plan_cache)
+        self.assertEqual(len(executor._result_cache), 1)
+
     def test_error_handling(self):
-        result = self.executor.execute("SELECT * FROM non_existent_table")
-        self.assertTrue(result.startswith("Error:"))
+        with self.assertRaises(ExecutorError):
+            self.executor.execute("SELECT * FROM non_existent_table")
+        with self.assertRaises(ExecutorError):
+            self.executor.allocate_id("non_existent_table")
+        with self.assertRaises(ExecutorError):
+            self.executor.aggregate("non_existent_table", "SUM", "id")
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        with self.assertRaises(ExecutorError):
+            self.executor.aggregate("users", "SUM", "name")
+        # Parameters must be plain values (hashable, storable in the log)
+        with self.assertRaises(ExecutorError):
+            self.executor.execute("SELECT * FROM users WHERE id = ?", ([1],))
+        with self.assertRaises(ExecutorError):
+            self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(2, {'first': 'Bob'})])
+        self.assertEqual(self.executor.aggregate("users", "COUNT", "id"), 1)
 
 if __name__ == '__main__':
     unittest.main()
@@ -35,5 +35,15 @@ class TestIndex(unittest.TestCase):
         self.idx.delete(1, 0)
         self.assertEqual(self.idx.lookup(1), set())
 
+    def test_bulk_load(self):
+        self.non_unique.bulk_load(["Alice", "Bob", "Alice"], range(3))
+        self.assertEqual(self.non_unique.lookup("Alice"), {0, 2})
+        
+        self.idx.bulk_load([1, 2], range(2))
+        self.assertEqual(self.idx.get(2), 1)
+        with self.assertRaises(ValueError):
+            self.idx.bulk_load([3, 3], range(2, 4))
+        self.assertIsNone(self.idx.get(3))
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,7 +5,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from storage import Database
-from executor import Executor
+from executor import Executor, ExecutorError
 
 class TestJoin(unittest.TestCase):
     def setUp(self):
@@ -45,6 +45,18 @@ class TestJoin(unittest.TestCase):
         names = sorted([r['users.name'] for r in results])
         self.assertEqual(names, ['Alice', 'Alice', 'Bob'])
 
+    def test_join_select_star(self):
+        sql = "SELECT * FROM users JOIN orders ON users.id = orders.uid WHERE orders.item = 'Keyboard'"
+        self.assertEqual(self.executor.execute(sql), [
+            {'users.id': 2, 'users.name': 'Bob', 'orders.oid': 103, 'orders.uid': 2, 'orders.item': 'Keyboard'}
+        ])
+        
+        # '*' next to other columns adds every joined column after them
+        users = self.db.get_table("users")
+        results = users.inner_join(self.db.get_table("orders"), "id", "uid", ["item", "*"], {"oid": 103})
+        self.assertEqual(list(results[0]), ['item', 'users.id', 'users.name', 'orders.oid', 'orders.uid', 'orders.item'])
+        self.assertEqual(results[0]['item'], 'Keyboard')
+
     def test_join_with_where(self):
         # Query: ... WHERE users.name = 'Alice'
         sql = "SELECT users.name, orders.item FROM users JOIN orders ON users.id = orders.uid WHERE users.name = 'Alice'"
@@ -56,10 +68,18 @@ class TestJoin(unittest.TestCase):
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]['users.name'], 'Alice')
 
+    def test_join_where_both_tables(self):
+        users = self.db.get_table("users")
+        orders = self.db.get_table("orders")
+        results = users.inner_join(orders, "id", "uid", select_columns=["item"],
+                                   where={"users.name": "Alice", "item": "Mouse"})
+        self.assertEqual(results, [{"item": "Mouse"}])
+        self.assertEqual(users.inner_join(orders, "id", "uid", where={"name": "Bob", "oid": 101}), [])
+
     def test_invalid_join_col(self):
         sql = "SELECT * FROM users JOIN orders ON users.id = orders.invalid_col"
-        result = self.executor.execute(sql)
-        self.assertTrue(isinstance(result, str) and result.startswith("Error"))
+        with self.assertRaises(ExecutorError):
+            self.executor.execute(sql)
 
 if __name__ == '__main__':
     unittest.main()
@@ -23,6 +23,11 @@ class TestParser(unittest.TestCase):
         self.assertEqual(res['table'], 'users')
         self.assertEqual(res['values'], [1, 'Alice', 3.5])
 
+    def test_literal_coercion(self):
+        res = parse_insert("INSERT INTO t VALUES (-5, TRUE, false, 2.5, 'x', ?)")
+        self.assertEqual(res['values'][:4], [-5, True, False, 2.5])
+        self.assertIs(type(res['values'][0]), int)
+
     def test_select_all(self):
         sql = "SELECT * FROM users"
         res = parse_select(sql)
@@ -45,15 +50,33 @@ class TestParser(unittest.TestCase):
         self.assertEqual(res['set']['age'], 30)
         self.assertEqual(res['where']['id'], 1)
 
+    def test_quoted_delimiters(self):
+        res = parse_select("SELECT * FROM t WHERE a = 'x AND y' AND b = 2")
+        self.assertEqual(res['where'], {'a': 'x AND y', 'b': 2})
+        res = parse_update("UPDATE t SET a = 'p, q', b = 3")
+        self.assertEqual(res['set'], {'a': 'p, q', 'b': 3})
+        with self.assertRaises(ValueError):
+            parse_select("SELECT * FROM t WHERE a = 1 AND junk")
+
     def test_delete(self):
         sql = "DELETE FROM users WHERE id = 5"
         res = parse_delete(sql)
         self.assertEqual(res['table'], 'users')
         self.assertEqual(res['where']['id'], 5)
 
+    def test_trailing_text_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_delete("DELETE FROM users junk")
+
     def test_command_routing(self):
         res = parse_command("SELECT * FROM users")
         self.assertEqual(res['command'], 'SELECT')
 
+    def test_parse_cache_returns_copies(self):
+        first = parse_command("INSERT INTO users VALUES (1, 'Alice')")
+        first['values'].append('extra')
+        second = parse_command("  INSERT INTO users VALUES (1, 'Alice')  ")
+        self.assertEqual(second['values'], [1, 'Alice'])
+
 if __name__ == '__main__':
     unittest.main()
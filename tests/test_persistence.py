@@ -7,7 +7,7 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from storage import Database
-from executor import Executor
+from executor import Executor, ExecutorError
 
 class TestPersistence(unittest.TestCase):
     def setUp(self):
@@ -16,8 +16,9 @@ class TestPersistence(unittest.TestCase):
         self.executor = Executor(self.db)
 
     def tearDown(self):
-        if os.path.exists(self.db_filename):
-            os.remove(self.db_filename)
+        for suffix in ("", ".wal", ".lock"):
+            if os.path.exists(self.db_filename + suffix):
+                os.remove(self.db_filename + suffix)
 
     def test_save_and_load(self):
         # 1. Create Data
@@ -59,5 +60,82 @@ class TestPersistence(unittest.TestCase):
         res = ex2.execute("SELECT v FROM config WHERE k = 'theme'")
         self.assertEqual(res[0]['v'], 'light')
 
+    def test_load_legacy_row_format(self):
+        data = {"tables": {"users": {
+            "columns": [["id", "INTEGER"], ["name", "TEXT"]],
+            "primary_key": "id",
+            "unique_columns": [],
+            "rows": [[1, "Alice"], [2, "Bob"]]
+        }}}
+        with open(self.db_filename, 'w') as f:
+            json.dump(data, f)
+        
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        table = new_db.get_table("users")
+        self.assertEqual(table.rows, [[1, "Alice"], [2, "Bob"]])
+        self.assertEqual(table.indexes["id"].lookup(2), {1})
+
+    def test_transaction_defers_save(self):
+        executor = Executor(self.db, self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        os.remove(self.db_filename)
+        
+        with executor.transaction():
+            executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+            executor.execute("INSERT INTO users VALUES (2, 'Bob')")
+            self.assertFalse(os.path.exists(self.db_filename))
+        
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual(len(new_db.get_table("users").rows), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        executor = Executor(self.db, self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        
+        with self.assertRaises(ExecutorError):
+            with executor.transaction():
+                executor.execute("INSERT INTO users VALUES (2, 'Bob')")
+                executor.execute("INSERT INTO users VALUES (1, 'Duplicate')")
+        
+        self.assertEqual(len(self.db.get_table("users").rows), 1)
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual(len(new_db.get_table("users").rows), 1)
+
+    def test_transaction_rolls_back_in_memory(self):
+        self.executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        self.executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        self.executor.execute("INSERT INTO users VALUES (2, 'Bob')")
+        
+        with self.assertRaises(RuntimeError):
+            with self.executor.transaction():
+                self.executor.execute("UPDATE users SET name = 'Alicia' WHERE id = 1")
+                self.executor.execute("DELETE FROM users WHERE id = 2")
+                self.executor.execute_many("INSERT INTO users VALUES (?, ?)", [(3, 'Carol'), (4, 'Dave')])
+                self.executor.execute("CREATE TABLE scratch (id INTEGER PRIMARY KEY)")
+                raise RuntimeError("abort")
+        
+        users = self.db.get_table("users")
+        self.assertEqual(users.rows, [[1, "Alice"], [2, "Bob"]])
+        self.assertEqual(users.select(columns=["id"], where={"name": "Bob"}), [{"id": 2}])
+        self.assertEqual(users.allocate_id(), 3)
+        self.assertNotIn("scratch", self.db.tables)
+
+    def test_rebind_switches_file(self):
+        executor = Executor(self.db, self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        
+        self.db.reset()
+        executor.rebind(self.db, None)
+        self.assertEqual(self.db.tables, {})
+        executor.execute("CREATE TABLE other (id INTEGER PRIMARY KEY)")
+        
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual(list(new_db.tables), ["users"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from repl import REPL, PRINT_BATCH_SIZE
+
+class TestREPLScript(unittest.TestCase):
+    def setUp(self):
+        self.repl = REPL()
+        self.run_script("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT);")
+
+    def run_script(self, script):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.repl.run_script(script)
+        return out.getvalue().splitlines()
+
+    def fill(self, n):
+        self.repl.db.get_table("t").insert_many([[i, f"name {i}"] for i in range(n)])
+
+    def test_statements_on_one_line(self):
+        lines = self.run_script("INSERT INTO t VALUES (1, 'a'); INSERT INTO t VALUES (2, 'b'); SELECT id FROM t;")
+        self.assertEqual(lines, ["1 row inserted.", "1 row inserted.", "id", "--", "1 ", "2 ", "(2 rows)"])
+
+    def test_statement_split_across_lines(self):
+        lines = self.run_script("INSERT INTO t\nVALUES (1, 'a')\n;")
+        self.assertEqual(lines, ["1 row inserted."])
+
+    def test_final_statement_without_semicolon(self):
+        lines = self.run_script("INSERT INTO t VALUES (1, 'a');\nSELECT name FROM t\nWHERE id = 1")
+        self.assertEqual(lines, ["1 row inserted.", "name", "----", "a   ", "(1 rows)"])
+
+    def test_error_mid_script(self):
+        lines = self.run_script("INSERT INTO t VALUES (1, 'a');\nSELECT * FROM missing;\nINSERT INTO t VALUES (2, 'b'); SELECT * FROM missing; SELECT id FROM t WHERE id = 2;")
+        self.assertEqual(lines, [
+            "1 row inserted.",
+            "Error: Table 'missing' not found",
+            "1 row inserted.",
+            "Error: Table 'missing' not found",
+            "id", "--", "2 ", "(1 rows)",
+        ])
+
+    def test_meta_command(self):
+        lines = self.run_script(".tables\nSELECT * FROM t;")
+        self.assertEqual(lines, ["Tables:", "  - t", "(0 rows)"])
+
+    def test_print_batch_size_rows(self):
+        self.fill(PRINT_BATCH_SIZE)
+        lines = self.run_script("SELECT id FROM t;")
+        self.assertEqual(len(lines), PRINT_BATCH_SIZE + 3)
+        self.assertEqual(lines[-2].rstrip(), str(PRINT_BATCH_SIZE - 1))
+        self.assertEqual(lines[-1], f"({PRINT_BATCH_SIZE} rows)")
+
+    def test_over_print_batch_size_rows(self):
+        self.fill(PRINT_BATCH_SIZE + 1)
+        lines = self.run_script("SELECT id FROM t;")
+        self.assertEqual(len(lines), PRINT_BATCH_SIZE + 4)
+        self.assertEqual(lines[-2], str(PRINT_BATCH_SIZE))
+        self.assertEqual(lines[-1], f"({PRINT_BATCH_SIZE + 1} rows)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import json
+import tempfile
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -43,6 +45,86 @@ class TestTable(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["id"], 2)
 
+    def test_select_multiple_conditions(self):
+        self.table.insert_row([1, "Alice", "a@a.com"])
+        self.table.insert_row([2, "Bob", "b@b.com"])
+        self.assertEqual(len(self.table.select(where={"id": 2, "name": "Bob"})), 1)
+        self.assertEqual(self.table.select(where={"id": 2, "name": "Alice"}), [])
+        with self.assertRaises(ValueError):
+            self.table.select(where={"missing": 1})
+        with self.assertRaises(ValueError):
+            self.table.select(where={"id": 99, "missing": 1})
+
+    def test_select_unindexed_conditions(self):
+        self.table.insert_many([[1, "Alice", "a@a.com"], [2, "Bob", "b@b.com"], [3, "Bob", "c@c.com"]])
+        self.assertEqual(self.table.select(columns=["id"], where={"name": "Bob", "email": "c@c.com"}), [{"id": 3}])
+        self.table.delete(where={"id": 3})
+        self.assertEqual(self.table.select(where={"name": "Bob", "email": "c@c.com"}), [])
+
+    def test_auto_index(self):
+        self.table.insert_many([[i, f"User {i % 10}", f"u{i}@x.com"] for i in range(100)])
+        self.assertEqual([r["id"] for r in self.table.select(where={"name": "User 3"})][:2], [3, 13])
+        self.assertIn("auto_name", self.table.secondary_indexes)
+        
+        # Maintained like any secondary index
+        self.table.update({"name": "User 3"}, where={"id": 4})
+        self.table.delete(where={"id": 3})
+        self.assertEqual(self.table.count({"name": "User 3"}), 10)
+        self.assertEqual([r["id"] for r in self.table.select(where={"name": "User 3"})][:2], [4, 13])
+
+    def test_count(self):
+        self.table.insert_many([[1, "Alice", "a@a.com"], [2, "Bob", "b@b.com"], [3, "Bob", "c@c.com"]])
+        self.table.delete(where={"id": 1})
+        self.assertEqual(self.table.count(), 2)
+        self.assertEqual(self.table.count({"name": "Bob"}), 2)
+        self.assertEqual(self.table.count({"email": "a@a.com"}), 0)
+        self.assertEqual(self.table.count({"name": "Bob", "id": 3}), 1)
+        with self.assertRaises(ValueError):
+            self.table.count({"missing": 1})
+
+    def test_aggregate(self):
+        sales = Table("sales", [("id", "INTEGER"), ("amount", "INTEGER"), ("method", "TEXT")], primary_key="id")
+        sales.insert_many([[1, 500, "Cash"], [2, 1200, "Card"], [3, 300, "Cash"]])
+        self.assertEqual(sales.aggregate("SUM", "amount"), 2000)
+        self.assertEqual(sales.aggregate("max", "amount", {"method": "Cash"}), 500)
+        self.assertEqual(sales.aggregate("AVG", "amount", {"method": "Cash"}), 400)
+        self.assertEqual(sales.aggregate("COUNT", "id", {"method": "Cash"}), 2)
+        sales.delete(where={"id": 2})
+        self.assertEqual(sales.aggregate("SUM", "amount"), 800)
+        self.assertIsNone(sales.aggregate("MIN", "amount", {"method": "Card"}))
+        with self.assertRaises(ValueError):
+            sales.aggregate("MEDIAN", "amount")
+        
+        # None is skipped; TEXT can't be summed but has a MIN/MAX
+        sales.insert_row([4, None, "Card"])
+        self.assertEqual(sales.aggregate("SUM", "amount"), 800)
+        self.assertEqual(sales.aggregate("AVG", "amount"), 400)
+        self.assertIsNone(sales.aggregate("MAX", "amount", {"method": "Card"}))
+        self.assertEqual(sales.aggregate("MIN", "method"), "Card")
+        with self.assertRaises(ValueError):
+            sales.aggregate("SUM", "method")
+        with self.assertRaises(ValueError):
+            sales.aggregate("AVG", "method")
+
+    def test_select_uses_secondary_index(self):
+        sales = Table("sales", [("id", "INTEGER"), ("sale_date", "TEXT"), ("method", "TEXT")], primary_key="id")
+        sales.insert_many([[1, "2026-01-01 09:00", "Cash"], [2, "2026-01-01 10:00", "Card"],
+                           [3, "2026-01-02 09:00", "Cash"]])
+        sales.create_index("sale_day", "sale_date", prefix_length=10)
+        rows = sales.select(columns=["id"], where={"method": "Cash", "sale_date": "2026-01-01 09:00"})
+        self.assertEqual(rows, [{"id": 1}])
+        self.assertEqual(sales.select(where={"method": "Card", "sale_date": "2026-01-02 09:00"}), [])
+        
+        # Whole-value index: its lookups are exact
+        sales.create_index("by_method", "method")
+        self.assertEqual([r["id"] for r in sales.select(where={"method": "Cash"})], [1, 3])
+        self.assertEqual([r["id"] for r in sales.select(where={"method": "Cash", "id": 3})], [3])
+        # Both conditions indexed: the smaller day posting set is intersected first
+        rows = sales.select(columns=["id"], where={"method": "Cash", "sale_date": "2026-01-02 09:00"})
+        self.assertEqual(rows, [{"id": 3}])
+        sales.update({"method": "Card"}, where={"id": 3})
+        self.assertEqual(sales.count({"method": "Cash"}), 1)
+
     def test_update(self):
         self.table.insert_row([1, "Alice", "a@a.com"])
         count = self.table.update({"name": "Alice Cooper"}, where={"id": 1})
@@ -50,6 +132,19 @@ class TestTable(unittest.TestCase):
         results = self.table.select(where={"id": 1})
         self.assertEqual(results[0]["name"], "Alice Cooper")
 
+    def test_update_many_rows(self):
+        self.table.insert_many([[1, "Alice", "a@a.com"], [2, "Bob", "b@b.com"], [3, "Bob", "c@c.com"]])
+        self.assertEqual(self.table.update({"name": "Robert"}, where={"name": "Bob"}), 2)
+        self.assertEqual([r["id"] for r in self.table.select(where={"name": "Robert"})], [2, 3])
+        
+        # Two rows can't share one unique value: nothing is written
+        with self.assertRaises(ValueError):
+            self.table.update({"name": "Bobby", "email": "x@x.com"}, where={"name": "Robert"})
+        with self.assertRaises(ValueError):
+            self.table.update({"email": "a@a.com"}, where={"id": 2})
+        self.assertEqual(self.table.select(where={"name": "Bobby"}), [])
+        self.assertEqual(self.table.select(columns=["id"], where={"email": "a@a.com"}), [{"id": 1}])
+
     def test_delete(self):
         self.table.insert_row([1, "Alice", "a@a.com"])
         self.table.insert_row([2, "Bob", "b@b.com"])
@@ -59,6 +154,44 @@ class TestTable(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["name"], "Bob")
 
+    def test_prefix_index(self):
+        sales = Table("sales", [("id", "INTEGER"), ("sale_date", "TEXT")], primary_key="id")
+        sales.insert_row([1, "2026-01-01 09:00"])
+        sales.create_index("sale_day", "sale_date", prefix_length=10)
+        sales.insert_row([2, "2026-01-02 10:00"])
+        sales.insert_row([3, "2026-01-01 17:30"])
+        self.assertEqual([r["id"] for r in sales.lookup_by("sale_day", "2026-01-01")], [1, 3])
+        
+        sales.delete(where={"id": 1})
+        sales.update({"sale_date": "2026-01-01 12:00"}, where={"id": 2})
+        self.assertEqual([r["id"] for r in sales.lookup_by("sale_day", "2026-01-01")], [2, 3])
+        self.assertEqual(sales.lookup_by("sale_day", "2026-01-02"), [])
+
+    def test_columnar_storage(self):
+        self.table.insert_row([1, "Alice", "a@a.com"])
+        self.table.insert_many([[2, "Bob", "b@b.com"], [3, "Carol", "c@c.com"]])
+        self.table.delete(where={"id": 2})
+        self.table.update({"name": "Caroline"}, where={"id": 3})
+        self.assertEqual(self.table.rows, [[1, "Alice", "a@a.com"], [3, "Caroline", "c@c.com"]])
+        
+        # Deleted rows are tombstoned until vacuum() compacts the columns
+        self.assertEqual(self.table.n_rows, 3)
+        self.assertEqual(self.table.vacuum(), 1)
+        self.assertEqual(self.table.columns_data, [[1, 3], ["Alice", "Caroline"], ["a@a.com", "c@c.com"]])
+        self.assertEqual(self.table.select(columns=["name"], where={"id": 3}), [{"name": "Caroline"}])
+        self.table.insert_row([2, "Bob", "b@b.com"])
+        self.assertEqual([r["id"] for r in self.table.select(where={"name": "Bob"})], [2])
+
+    def test_allocate_id(self):
+        self.assertEqual(self.table.allocate_id(), 1)
+        self.table.insert_row([5, "Alice", "a@a.com"])
+        self.assertEqual(self.table.allocate_id(), 6)
+        self.assertEqual(self.table.allocate_id(), 7)
+        
+        # A primary key written by UPDATE is never allocated
+        self.table.update({"id": 9}, where={"id": 5})
+        self.assertEqual(self.table.allocate_id(), 10)
+
 class TestDatabase(unittest.TestCase):
     def setUp(self):
         self.db = Database()
@@ -73,5 +206,27 @@ class TestDatabase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.db.get_table("users")
 
+    def test_auto_index_not_saved(self):
+        self.db.create_table("users", [("id", "INTEGER"), ("name", "TEXT")], primary_key="id")
+        table = self.db.get_table("users")
+        table.insert_many([[i, f"User {i % 10}"] for i in range(100)])
+        table.select(where={"name": "User 3"})
+        self.assertIn("auto_name", table.secondary_indexes)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "test.josedb")
+            self.db.save_to_file(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["tables"]["users"]["secondary_indexes"], {})
+            loaded = Database()
+            loaded.load_from_file(path)
+        
+        # Rebuilt by the first lookup that needs it
+        users = loaded.get_table("users")
+        self.assertNotIn("auto_name", users.secondary_indexes)
+        self.assertEqual(users.count({"name": "User 3"}), 10)
+        self.assertEqual(len(users.select(where={"name": "User 3"})), 10)
+        self.assertIn("auto_name", users.secondary_indexes)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import threading
+from unittest import mock
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from storage import Database
+from executor import Executor, ExecutorError
+from wal import WriteAheadLog, WAL_SUFFIX, LOCK_SUFFIX, file_lock, fcntl
+
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.db_filename = "test_wal.josedb"
+        self.wal_filename = self.db_filename + WAL_SUFFIX
+
+    def tearDown(self):
+        for f in (self.db_filename, self.wal_filename, self.db_filename + LOCK_SUFFIX):
+            if os.path.exists(f):
+                os.remove(f)
+
+    def test_append_and_read(self):
+        wal = WriteAheadLog(self.wal_filename)
+        wal.append([{"command": "DROP_TABLE", "table": "a"}])
+        wal.append([{"command": "DROP_TABLE", "table": "b"}])
+        self.assertEqual([e["table"] for e in wal.read()], ["a", "b"])
+        
+        # A torn last line is ignored
+        with open(self.wal_filename, 'a') as f:
+            f.write('{"command": "DRO')
+        self.assertEqual(len(wal.read()), 2)
+        
+        # ... and cut off before the next append
+        wal.append([{"command": "DROP_TABLE", "table": "c"}])
+        self.assertEqual([e["table"] for e in wal.read()], ["a", "b", "c"])
+
+    @unittest.skipIf(fcntl is None, "no advisory locks on this platform")
+    def test_file_lock_excludes_threads(self):
+        open(self.db_filename, 'w').close()
+        acquired = threading.Event()
+
+        def acquire():
+            with file_lock(self.db_filename):
+                acquired.set()
+
+        with file_lock(self.db_filename):
+            with file_lock(self.db_filename):
+                pass  # re-entrant in the holding thread
+            other = threading.Thread(target=acquire)
+            other.start()
+            self.assertFalse(acquired.wait(0.2))
+        other.join(1)
+        self.assertTrue(acquired.is_set())
+
+    def test_modifications_are_logged_and_replayed(self):
+        executor = Executor(Database(), self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(10, 20):
+            executor.execute("INSERT INTO users VALUES (?, ?)", (i, f'User {i}'))
+        executor.compact()
+        snapshot_size = os.path.getsize(self.db_filename)
+        
+        executor.execute("INSERT INTO users VALUES (?, ?)", (2, 'Bob'))
+        executor.execute("UPDATE users SET name = 'Robert' WHERE id = 2")
+        executor.execute_many("INSERT INTO users VALUES (?, ?)", [(3, 'Carol'), (4, 'Dave')])
+        
+        # Snapshot untouched; changes live in the log
+        self.assertEqual(os.path.getsize(self.db_filename), snapshot_size)
+        self.assertTrue(os.path.exists(self.wal_filename))
+        
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        rows = new_db.get_table("users").select(where={"id": 2})
+        self.assertEqual(rows[0]["name"], "Robert")
+        self.assertEqual(len(new_db.get_table("users").select(where={"id": 4})), 1)
+
+    def test_secondary_index_persisted(self):
+        executor = Executor(Database(), self.db_filename)
+        executor.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, sale_date TEXT)")
+        executor.create_index("sales", "sale_day", "sale_date", prefix_length=10)
+        executor.execute("INSERT INTO sales VALUES (1, '2026-01-01 09:00')")
+        
+        for compact in (False, True):
+            if compact:
+                executor.compact()
+            new_db = Database()
+            new_db.load_from_file(self.db_filename)
+            rows = new_db.get_table("sales").lookup_by("sale_day", "2026-01-01")
+            self.assertEqual([r["id"] for r in rows], [1])
+
+    def test_concurrent_writers(self):
+        setup = Executor(Database(), self.db_filename)
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executors = []
+        for _ in range(2):
+            db = Database()
+            db.load_from_file(self.db_filename)
+            executors.append(Executor(db, self.db_filename))
+        first, second = executors
+        
+        # Each writer reloads the other's changes before appending its own
+        first.execute("INSERT INTO users VALUES (2, 'Bob')")
+        second.execute("INSERT INTO users VALUES (3, 'Carol')")
+        self.assertEqual(len(second.execute("SELECT * FROM users")), 2)
+        
+        # A change that no longer applies is refused, not logged
+        first.execute("INSERT INTO users VALUES (4, 'Dave')")
+        with self.assertRaises(ExecutorError):
+            second.execute("INSERT INTO users VALUES (4, 'Dan')")
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual([r["name"] for r in new_db.get_table("users").select(where={"id": 4})], ["Dave"])
+        self.assertEqual(new_db.get_table("users").count(), 3)
+
+    def test_replay_skips_failing_entries(self):
+        executor = Executor(Database(), self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        WriteAheadLog(self.wal_filename).append([
+            {"command": "INSERT", "table": "users", "values": [1, "Alicia"]},
+            {"command": "INSERT", "table": "users", "values": [2, "Bob"]},
+        ])
+        
+        new_db = Database()
+        with self.assertWarnsRegex(UserWarning, r"skipped log entry \d+ \(INSERT .*Primary key 1"):
+            new_db.load_from_file(self.db_filename)
+        self.assertEqual([r["name"] for r in new_db.get_table("users").select()], ["Alice", "Bob"])
+
+    def test_failed_compaction_keeps_log(self):
+        executor = Executor(Database(), self.db_filename)
+        executor.execute("CREATE TABLE events (v INTEGER)")
+        with mock.patch("storage.os.replace", side_effect=OSError("busy")):
+            with self.assertWarnsRegex(UserWarning, "keeping the log"):
+                for v in range(5):
+                    executor.execute("INSERT INTO events VALUES (?)", (v,))
+        self.assertEqual(len(WriteAheadLog(self.wal_filename).read()), 5)
+        
+        # Each change is logged once; compaction succeeds on the next flush
+        executor.execute("INSERT INTO events VALUES (5)")
+        self.assertFalse(os.path.exists(self.wal_filename))
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual([r["v"] for r in new_db.get_table("events").select()], list(range(6)))
+
+    def test_compaction_clears_log(self):
+        executor = Executor(Database(), self.db_filename)
+        executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO users VALUES (1, 'Alice')")
+        executor.compact()
+        self.assertFalse(os.path.exists(self.wal_filename))
+        
+        new_db = Database()
+        new_db.load_from_file(self.db_filename)
+        self.assertEqual(len(new_db.get_table("users").rows), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,12 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from storage import Database
-from executor import Executor
+from executor import Executor, ExecutorError
 
 app = Flask(__name__)
 
-# Initialize DB
-DB_FILE = "pesapal_demo.josedb"
+# Initialize DB (docker-compose points MYDB_FILE into its mounted data directory)
+DB_FILE = os.environ.get("MYDB_FILE", "pesapal_demo.josedb")
 db = Database()
 executor = Executor(db, DB_FILE)
 
@@ -26,24 +26,23 @@ else:
     executor.execute("CREATE TABLE merchants (id INTEGER PRIMARY KEY, name TEXT UNIQUE, commission INTEGER)")
     executor.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, merchant_id INTEGER, amount INTEGER, customer TEXT, status TEXT, date TEXT)")
     
-    # Seed Data
-    executor.execute("INSERT INTO merchants VALUES (1, 'Java House', 3)")
-    executor.execute("INSERT INTO merchants VALUES (2, 'Artcaffe', 5)")
-    executor.execute("INSERT INTO transactions VALUES (101, 1, 500, 'John Doe', 'COMPLETED', '2023-10-01')")
-    executor.execute("INSERT INTO transactions VALUES (102, 2, 1200, 'Jane Smith', 'COMPLETED', '2023-10-02')")
+    # Seed Data (one batch per table)
+    executor.execute_many("INSERT INTO merchants VALUES (?, ?, ?)", [
+        (1, 'Java House', 3),
+        (2, 'Artcaffe', 5),
+    ])
+    executor.execute_many("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", [
+        (101, 1, 500, 'John Doe', 'COMPLETED', '2023-10-01'),
+        (102, 2, 1200, 'Jane Smith', 'COMPLETED', '2023-10-02'),
+    ])
 
 @app.route('/')
 def dashboard():
     # 1. Get Summary Stats
-    # Since we don't have COUNT/SUM yet, we fetch all and calculate in Python
-    # This is a normal pattern for lighter DBs.
-    
-    merchants = executor.execute("SELECT * FROM merchants")
-    transactions = executor.execute("SELECT * FROM transactions")
-    
-    total_merchants = len(merchants)
-    total_volume = sum(int(t['amount']) for t in transactions)
-    total_tx = len(transactions)
+    # Aggregated straight from the columns, no rows are fetched
+    total_merchants = executor.aggregate('merchants', 'COUNT', 'id')
+    total_volume = executor.aggregate('transactions', 'SUM', 'amount')
+    total_tx = executor.aggregate('transactions', 'COUNT', 'id')
     
     # 2. Get Recent Transactions (with JOIN to show Merchant Name!)
     # "SELECT merchants.name, transactions.id, transactions.amount, transactions.customer, transactions.status, transactions.date 
@@ -71,9 +70,10 @@ def merchants_page():
             new_id = max(int(r['id']) for r in current) + 1
             
         sql = f"INSERT INTO merchants VALUES ({new_id}, '{name}', {rate})"
-        res = executor.execute(sql)
-        if str(res).startswith("Error"):
-             return f"Error: {res}"
+        try:
+            executor.execute(sql)
+        except ExecutorError as e:
+            return f"Error: {e}"
         return redirect(url_for('merchants_page'))
         
     merchants = executor.execute("SELECT * FROM merchants")
@@ -97,7 +97,10 @@ def terminal_page():
         date = datetime.now().strftime("%Y-%m-%d %H:%M")
         
         sql = f"INSERT INTO transactions VALUES ({new_id}, {merchant_id}, {amount}, '{customer}', 'COMPLETED', '{date}')"
-        executor.execute(sql)
+        try:
+            executor.execute(sql)
+        except ExecutorError as e:
+            return f"Error: {e}"
         return redirect(url_for('dashboard'))
         
     return render_template('terminal.html', merchants=merchants)
@@ -105,14 +108,20 @@ def terminal_page():
 @app.route('/delete_transaction/<int:tx_id>', methods=['POST'])
 def delete_transaction(tx_id):
     sql = f"DELETE FROM transactions WHERE id = {tx_id}"
-    executor.execute(sql)
+    try:
+        executor.execute(sql)
+    except ExecutorError as e:
+        return f"Error: {e}"
     return redirect(url_for('dashboard'))
 
 @app.route('/update_merchant/<int:merchant_id>', methods=['POST'])
 def update_merchant(merchant_id):
     new_rate = request.form.get('commission')
     sql = f"UPDATE merchants SET commission = {new_rate} WHERE id = {merchant_id}"
-    executor.execute(sql)
+    try:
+        executor.execute(sql)
+    except ExecutorError as e:
+        return f"Error: {e}"
     return redirect(url_for('merchants_page'))
 
 if __name__ == '__main__':